@@ -0,0 +1,110 @@
+"""
+Resolution Cascade Benchmark
+Compares pose detection at full resolution with the adaptive cascade:
+mean latency, share of images resolved per tier, and how closely the
+cascade's measurements agree with the full-resolution path.
+
+Usage: python benchmark_cascade.py path/to/images/ [tolerance_pct] [repeats]
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+
+# Measure in-process; no worker pool
+os.environ['AI_WORKERS'] = '0'
+
+import cv2
+import numpy as np
+
+from serve_model import BodyMeasurementAI, POSE_TIERS, create_pose_landmarker, landmarks_to_array
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def timed_detect(model: BodyMeasurementAI, image: np.ndarray, repeats: int):
+    """Return (pose result, mean seconds per detection)"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = model.detect_pose(image)
+    return result, (time.perf_counter() - start) / repeats
+
+
+def measure(model: BodyMeasurementAI, pose_result, image: np.ndarray):
+    return model.estimate_measurements(landmarks_to_array(pose_result['landmarks']), 'male',
+                                       image.shape[0])
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    paths = sorted(
+        os.path.join(sys.argv[1], name) for name in os.listdir(sys.argv[1])
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    tolerance = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    landmarker = create_pose_landmarker()
+    if landmarker is None:
+        print("Pose landmarker unavailable")
+        sys.exit(1)
+    full_model = BodyMeasurementAI(landmarker, cascade=False)
+    cascade_model = BodyMeasurementAI(landmarker, cascade=True)
+
+    full_seconds, cascade_seconds = [], []
+    tiers = Counter()
+    deviations = []
+    size_matches = 0
+    compared = 0
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        full_result, full_time = timed_detect(full_model, image, repeats)
+        cascade_result, cascade_time = timed_detect(cascade_model, image, repeats)
+        if not full_result or not cascade_result:
+            continue
+
+        full_seconds.append(full_time)
+        cascade_seconds.append(cascade_time)
+        tiers[cascade_result['tier']] += 1
+
+        full = measure(full_model, full_result, image)
+        cascade = measure(cascade_model, cascade_result, image)
+        # Largest relative difference across this image's measurements
+        deviations.append(max(
+            abs(cascade['measurements'][name] - value) / value * 100
+            for name, value in full['measurements'].items() if value
+        ))
+        size_matches += full['size_recommendation'] == cascade['size_recommendation']
+        compared += 1
+
+    if not compared:
+        print("No images with a detected pose")
+        sys.exit(1)
+
+    full_ms = np.mean(full_seconds) * 1000
+    cascade_ms = np.mean(cascade_seconds) * 1000
+    deviations = np.array(deviations)
+
+    print("=" * 60)
+    print(f"Images: {compared}, repeats per image: {repeats}")
+    print("=" * 60)
+    print(f"Full resolution  {full_ms:8.1f} ms mean")
+    print(f"Cascade          {cascade_ms:8.1f} ms mean  ({full_ms / cascade_ms:.2f}x)")
+    print("Tiers:           " + "  ".join(
+        f"{tier} {tiers[tier] / compared:6.1%}" for tier in POSE_TIERS
+    ))
+    print(f"Agreement:       {np.mean(deviations <= tolerance):6.1%} of images within "
+          f"{tolerance}% on every measurement (median max deviation "
+          f"{np.median(deviations):.2f}%, worst {deviations.max():.2f}%)")
+    print(f"Size agreement:  {size_matches / compared:6.1%}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
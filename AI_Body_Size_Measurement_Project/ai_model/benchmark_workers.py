@@ -0,0 +1,63 @@
+"""
+Inference Worker Scaling Benchmark
+Measures pose detection throughput with 1..N prefork workers
+
+Usage: python benchmark_workers.py path/to/full_body.jpg [max_workers] [requests]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Keep serve_model from creating a landmarker in the front process
+os.environ.setdefault('AI_WORKERS', '1')
+
+import cv2
+
+from inference_pool import InferencePool
+
+
+def run(detect, image, requests: int, concurrency: int) -> float:
+    """Return requests per second for detect() under the given concurrency"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: detect(image), range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    image = cv2.imread(sys.argv[1])
+    if image is None:
+        print(f"Could not read image: {sys.argv[1]}")
+        sys.exit(1)
+
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    requests = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    print("=" * 60)
+    print(f"Image: {image.shape[1]}x{image.shape[0]}, requests per run: {requests}")
+    print("=" * 60)
+
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        pool = InferencePool(workers)
+        try:
+            # Warm up so landmarker creation is not measured
+            run(pool.detect, image, workers * 2, workers)
+            throughput = run(pool.detect, image, requests, workers * 2)
+        finally:
+            pool.close()
+
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        print(f"workers={workers:2d}  {throughput:8.1f} req/s  "
+              f"speedup={speedup:5.2f}x  efficiency={speedup / workers:6.1%}")
+
+
+if __name__ == '__main__':
+    main()
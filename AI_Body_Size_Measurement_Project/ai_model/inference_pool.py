@@ -0,0 +1,329 @@
+"""
+Prefork Inference Worker Pool
+Runs pose detection in N worker processes that each own a landmarker.
+
+Images are handed to workers through multiprocessing.shared_memory buffers
+and landmarks come back the same way, so only buffer names cross the queues.
+Each worker has its own task queue and result pipe, so a worker killed
+mid-write cannot wedge the others; both are replaced when it restarts.
+Buffers of a job that timed out stay alive until its worker answers or
+exits, so a slow worker never attaches to an unlinked buffer.
+"""
+
+import itertools
+import multiprocessing as mp_proc
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# MediaPipe Pose returns 33 landmarks of (x, y, z, visibility)
+NUM_LANDMARKS = 33
+LANDMARK_FIELDS = 4
+LANDMARK_SHAPE = (NUM_LANDMARKS, LANDMARK_FIELDS)
+LANDMARK_NBYTES = NUM_LANDMARKS * LANDMARK_FIELDS * np.dtype(np.float32).itemsize
+
+
+class WorkerCrashedError(RuntimeError):
+    """Raised for jobs that were in flight on a worker that died"""
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a buffer owned by the front process.
+
+    Attaching registers the name with the resource tracker the worker shares
+    with the front process, where it is already registered, so this is a
+    no-op; the front's unlink() unregisters it. Workers must not unregister
+    it themselves (use track=False here on Python 3.13+).
+    """
+    return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(worker_id: int, task_queue, result_conn):
+    """Worker process loop: attach to shared buffers, run pose detection"""
+    # Imported here so the landmarker is created inside the worker process
+    from serve_model import BodyMeasurementAI, create_pose_landmarker
+
+    model = BodyMeasurementAI(create_pose_landmarker())
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        job_id, image_name, image_shape, result_name = task
+        image_shm = result_shm = None
+        try:
+            image_shm = _attach(image_name)
+            result_shm = _attach(result_name)
+            image = np.ndarray(image_shape, dtype=np.uint8, buffer=image_shm.buf)
+            pose_result = model.detect_pose(image)
+            del image
+
+            if not pose_result:
+                result_conn.send((job_id, None, None))
+                continue
+
+            landmarks = np.ndarray(LANDMARK_SHAPE, dtype=np.float32, buffer=result_shm.buf)
+            landmarks[:] = [
+                (lm['x'], lm['y'], lm['z'], lm['visibility'])
+                for lm in pose_result['landmarks']
+            ]
+            del landmarks
+            result_conn.send((job_id, pose_result['tier'], None))
+        except Exception as e:
+            result_conn.send((job_id, None, str(e)))
+        finally:
+            for shm in (image_shm, result_shm):
+                if shm is not None:
+                    shm.close()
+
+
+def _release(*buffers: shared_memory.SharedMemory):
+    """Close and unlink buffers created by the front process"""
+    for shm in buffers:
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class InferencePool:
+    """Pool of prefork pose detection workers with shared-memory hand-off"""
+
+    def __init__(self, num_workers: int, monitor_interval: float = 0.5,
+                 restart_backoff: float = 0.5, max_restart_backoff: float = 30.0,
+                 max_restarts: int = 5, min_uptime: float = 10.0):
+        self.num_workers = num_workers
+        self.monitor_interval = monitor_interval
+        # A worker that dies within min_uptime of starting is restarted after
+        # an exponentially growing delay; after max_restarts such crashes in
+        # a row it is given up on and the pool reports itself unhealthy
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.max_restarts = max_restarts
+        self.min_uptime = min_uptime
+        # Spawn so no worker inherits the front process' MediaPipe threads
+        self._ctx = mp_proc.get_context('spawn')
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._jobs: Dict[int, Future] = {}
+        self._in_flight: Dict[int, set] = {}
+        # Timed-out jobs whose buffers a worker may still use: job id ->
+        # (worker id, buffers), released when the worker answers or exits
+        self._abandoned: Dict[int, Tuple[int, tuple]] = {}
+        self._workers: Dict[int, mp_proc.Process] = {}
+        self._task_queues: Dict[int, object] = {}
+        self._result_conns: Dict[int, object] = {}
+        self._started_at: Dict[int, float] = {}
+        self._crashes: Dict[int, int] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._failed: set = set()
+        self.restarts = 0
+        self._closed = False
+
+        for worker_id in range(num_workers):
+            self._start_worker(worker_id)
+
+        self._collector = threading.Thread(target=self._collect_results, daemon=True)
+        self._collector.start()
+        self._monitor = threading.Thread(target=self._monitor_workers, daemon=True)
+        self._monitor.start()
+
+    def _start_worker(self, worker_id: int):
+        task_queue = self._ctx.Queue()
+        result_conn, worker_conn = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, task_queue, worker_conn),
+            name=f"inference-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        # Only the worker holds the write end, so its death shows up as EOF
+        worker_conn.close()
+        self._task_queues[worker_id] = task_queue
+        self._result_conns[worker_id] = result_conn
+        self._workers[worker_id] = process
+        self._in_flight[worker_id] = set()
+        self._started_at[worker_id] = time.monotonic()
+
+    def _collect_results(self):
+        while not self._closed:
+            with self._lock:
+                conns = {conn: worker_id for worker_id, conn in self._result_conns.items()}
+            try:
+                ready = wait(list(conns), timeout=self.monitor_interval)
+            except OSError:
+                # A pipe was closed by the monitor since the snapshot
+                continue
+            for conn in ready:
+                try:
+                    job_id, tier, error = conn.recv()
+                except (EOFError, OSError):
+                    # The worker is gone; fail its jobs now instead of at the
+                    # next monitor pass
+                    with self._lock:
+                        if self._result_conns.get(conns[conn]) is conn:
+                            self._worker_exited(conns[conn])
+                    continue
+
+                with self._lock:
+                    future = self._jobs.pop(job_id, None)
+                    self._in_flight[conns[conn]].discard(job_id)
+                    abandoned = self._abandoned.pop(job_id, None)
+
+                if abandoned is not None:
+                    _release(*abandoned[1])
+                if future is None:
+                    continue
+                if error:
+                    future.set_exception(RuntimeError(error))
+                else:
+                    future.set_result(tier)
+
+    def _worker_exited(self, worker_id: int):
+        """Fail the dead worker's jobs and schedule its restart (holding _lock)"""
+        process = self._workers[worker_id]
+        process.join(1.0)
+        print(f"⚠️  Inference worker {worker_id} exited (code {process.exitcode})")
+
+        for job_id in self._in_flight[worker_id]:
+            future = self._jobs.pop(job_id, None)
+            if future is not None:
+                future.set_exception(WorkerCrashedError(f"Inference worker {worker_id} crashed"))
+        self._in_flight[worker_id] = set()
+        for job_id, (owner, buffers) in list(self._abandoned.items()):
+            if owner == worker_id:
+                del self._abandoned[job_id]
+                _release(*buffers)
+        self._result_conns.pop(worker_id).close()
+        task_queue = self._task_queues.pop(worker_id)
+        # Nobody reads this queue any more; don't block exit flushing it
+        task_queue.cancel_join_thread()
+        task_queue.close()
+
+        if time.monotonic() - self._started_at[worker_id] >= self.min_uptime:
+            self._crashes[worker_id] = 0
+        crashes = self._crashes[worker_id] = self._crashes.get(worker_id, 0) + 1
+        if crashes > self.max_restarts:
+            self._failed.add(worker_id)
+            print(f"❌ Inference worker {worker_id} crashed {crashes} times in a row, giving up")
+            return
+        delay = min(self.restart_backoff * 2 ** (crashes - 1), self.max_restart_backoff)
+        self._restart_at[worker_id] = time.monotonic() + delay
+
+    def _monitor_workers(self):
+        while not self._closed:
+            time.sleep(self.monitor_interval)
+            with self._lock:
+                if self._closed:
+                    break
+                for worker_id, process in list(self._workers.items()):
+                    if worker_id in self._result_conns and not process.is_alive():
+                        self._worker_exited(worker_id)
+
+                now = time.monotonic()
+                for worker_id, restart_at in list(self._restart_at.items()):
+                    if now >= restart_at:
+                        del self._restart_at[worker_id]
+                        print(f"🔄 Restarting inference worker {worker_id}")
+                        self._start_worker(worker_id)
+                        self.restarts += 1
+
+    def detect(self, image: np.ndarray,
+               timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, str]]:
+        """Run pose detection on a BGR uint8 image in a worker process.
+
+        Returns a (33, 4) float32 array of (x, y, z, visibility) and the
+        cascade tier that produced it, or None if no person was detected.
+        Raises concurrent.futures.TimeoutError after timeout seconds; the
+        worker may still finish the job, but its result is discarded.
+        """
+        if self._closed:
+            raise RuntimeError("Inference pool is closed")
+
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        image_shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+        result_shm = shared_memory.SharedMemory(create=True, size=LANDMARK_NBYTES)
+        handed_off = False
+        try:
+            np.ndarray(image.shape, dtype=np.uint8, buffer=image_shm.buf)[:] = image
+
+            future = Future()
+            with self._lock:
+                # Least-loaded running worker keeps a slow image from queueing others
+                running = [w for w in self._result_conns if self._workers[w].is_alive()]
+                if not running:
+                    raise WorkerCrashedError("No inference workers are running")
+                worker_id = min(running, key=lambda w: len(self._in_flight[w]))
+                job_id = next(self._job_ids)
+                self._jobs[job_id] = future
+                self._in_flight[worker_id].add(job_id)
+                self._task_queues[worker_id].put(
+                    (job_id, image_shm.name, image.shape, result_shm.name)
+                )
+
+            try:
+                tier = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                with self._lock:
+                    # Unless the answer raced in, the worker still owns the job
+                    if self._jobs.pop(job_id, None) is not None:
+                        self._in_flight[worker_id].discard(job_id)
+                        self._abandoned[job_id] = (worker_id, (image_shm, result_shm))
+                        handed_off = True
+                raise
+            if not tier:
+                return None
+
+            return np.ndarray(LANDMARK_SHAPE, dtype=np.float32, buffer=result_shm.buf).copy(), tier
+        finally:
+            if not handed_off:
+                _release(image_shm, result_shm)
+
+    def stats(self) -> Dict:
+        """Worker pool status for health checks"""
+        with self._lock:
+            return {
+                'workers': self.num_workers,
+                'alive': sum(p.is_alive() for p in self._workers.values()),
+                'in_flight': sum(len(jobs) for jobs in self._in_flight.values()),
+                'restarts': self.restarts,
+                'failed': sorted(self._failed),
+                'healthy': not self._failed
+            }
+
+    def close(self, timeout: float = 5.0):
+        """Stop all workers"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._restart_at.clear()
+            for task_queue in self._task_queues.values():
+                task_queue.put(None)
+
+        for process in self._workers.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout)
+
+        with self._lock:
+            abandoned, self._abandoned = self._abandoned, {}
+        for _, buffers in abandoned.values():
+            _release(*buffers)
+
+
+def landmarks_to_dicts(landmarks: np.ndarray) -> List[Dict]:
+    """Convert a (33, 4) landmark array to the list-of-dicts format"""
+    return [
+        {'x': float(x), 'y': float(y), 'z': float(z), 'visibility': float(v)}
+        for x, y, z, v in landmarks
+    ]
@@ -0,0 +1,106 @@
+"""
+Measurement Math
+Vectorized body measurement formulas over batches of pose landmarks
+
+Used by the inference server (batch of one) and the bulk recompute job,
+so stored landmarks can be re-measured without re-running pose detection.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+# Key landmark indices (MediaPipe Pose)
+NOSE = 0
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_WRIST = 15
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_ANKLE = 27
+
+# Landmarks are stored as float32[33][4] of (x, y, z, visibility)
+LANDMARK_SHAPE = (33, 4)
+LANDMARK_DTYPE = np.float32
+
+MALE_MEASUREMENTS = ['height', 'shoulder_width', 'hip', 'arm_length',
+                     'chest', 'waist', 'inseam', 'outseam']
+FEMALE_MEASUREMENTS = ['height', 'shoulder_width', 'hip', 'arm_length',
+                       'bust', 'under_bust', 'waist']
+
+# Upper bounds (exclusive) of each size on chest (male) / bust (female)
+MALE_SIZES = (np.array([90, 100, 110]), np.array(['S', 'M', 'L', 'XL']))
+FEMALE_SIZES = (np.array([80, 88, 96, 104]), np.array(['XS', 'S', 'M', 'L', 'XL']))
+
+
+def pack_landmarks(landmarks: np.ndarray) -> bytes:
+    """Pack a (33, 4) landmark array into 528 bytes"""
+    return np.ascontiguousarray(landmarks, dtype=LANDMARK_DTYPE).tobytes()
+
+
+def unpack_landmarks(data: bytes) -> np.ndarray:
+    """Unpack concatenated landmark blobs into an (N, 33, 4) array"""
+    return np.frombuffer(data, dtype=LANDMARK_DTYPE).reshape((-1,) + LANDMARK_SHAPE)
+
+
+def _distance(landmarks: np.ndarray, a: int, b: int, image_heights: np.ndarray) -> np.ndarray:
+    """Euclidean distance between two landmarks, in pixels"""
+    delta = landmarks[:, b, :2].astype(np.float64) - landmarks[:, a, :2]
+    return np.sqrt((delta ** 2).sum(axis=1)) * image_heights
+
+
+def estimate_batch(landmarks: np.ndarray, is_male: np.ndarray,
+                   reference_heights: np.ndarray,
+                   image_heights: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Estimate measurements for N poses at once.
+
+    landmarks is (N, 33, 4). Returns an array per measurement (NaN where a
+    measurement does not apply to the gender), plus 'confidence' and 'size'.
+    The image height cancels out of every ratio and only matters when the
+    nose-to-ankle distance is zero, so it defaults to 1.
+    """
+    count = landmarks.shape[0]
+    is_male = np.asarray(is_male, dtype=bool)
+    reference_heights = np.asarray(reference_heights, dtype=np.float64)
+    if image_heights is None:
+        image_heights = np.ones(count)
+
+    # Height (nose to ankle) is normalized to the reference height
+    height_pixels = _distance(landmarks, NOSE, LEFT_ANKLE, image_heights)
+    safe_height = np.where(height_pixels > 0, height_pixels, 1.0)
+    scale_factor = np.where(height_pixels > 0, reference_heights / safe_height, 1.0)
+
+    shoulder_width = _distance(landmarks, LEFT_SHOULDER, RIGHT_SHOULDER, image_heights) * scale_factor
+    hip = _distance(landmarks, LEFT_HIP, RIGHT_HIP, image_heights) * scale_factor * 3.14  # Approximate circumference
+    arm_length = _distance(landmarks, LEFT_SHOULDER, LEFT_WRIST, image_heights) * scale_factor
+
+    # Gender-specific measurements
+    nan = np.full(count, np.nan)
+    chest = np.where(is_male, shoulder_width * 2.5, nan)
+    bust = np.where(is_male, nan, shoulder_width * 2.3)
+
+    results = {
+        'height': reference_heights.copy(),
+        'shoulder_width': shoulder_width,
+        'hip': hip,
+        'arm_length': arm_length,
+        'chest': chest,
+        'waist': np.where(is_male, hip * 0.75, hip * 0.70),
+        'inseam': np.where(is_male, reference_heights * 0.45, nan),
+        'outseam': np.where(is_male, reference_heights * 0.58, nan),
+        'bust': bust,
+        'under_bust': bust * 0.85,
+    }
+
+    # Confidence is the mean landmark visibility, capped at 95%
+    results['confidence'] = np.minimum(landmarks[:, :, 3].astype(np.float64).mean(axis=1), 0.95)
+
+    male_bounds, male_labels = MALE_SIZES
+    female_bounds, female_labels = FEMALE_SIZES
+    results['size'] = np.where(
+        is_male,
+        male_labels[np.searchsorted(male_bounds, np.nan_to_num(chest), side='right')],
+        female_labels[np.searchsorted(female_bounds, np.nan_to_num(bust), side='right')]
+    )
+
+    return results
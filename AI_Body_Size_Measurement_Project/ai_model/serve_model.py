@@ -3,61 +3,176 @@ AI Model Inference Server
 Serves pose estimation and measurement models using MediaPipe 0.10.32+
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
 import cv2
 import mediapipe as mp
 import numpy as np
 from typing import Dict, List
+import atexit
 import base64
+import hmac
 import io
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
 from PIL import Image
+from pythonjsonlogger import jsonlogger
+
+# shared/ sits next to ai_model/ (and is mounted at /shared in containers)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "shared"))
+
+from measurement_math import (
+    estimate_batch, pack_landmarks, MALE_MEASUREMENTS, FEMALE_MEASUREMENTS,
+    NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, LEFT_HIP, RIGHT_HIP, LEFT_ANKLE
+)
+from inference_pool import WorkerCrashedError
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from sampling_profiler import SamplingProfiler
 
 app = Flask(__name__)
 CORS(app)
 
+MODEL_VERSION = os.getenv('AI_MODEL_VERSION', '1.0.0')
+
+# Request tracing: slow requests are always logged, others are sampled
+REQUEST_ID_HEADER = 'X-Request-ID'
+TRACE_SLOW_REQUEST_MS = float(os.getenv('TRACE_SLOW_REQUEST_MS', '2000'))
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.05'))
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+trace_logger = logging.getLogger('tracing')
+_trace_handler = logging.StreamHandler()
+_trace_handler.setFormatter(jsonlogger.JsonFormatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+trace_logger.addHandler(_trace_handler)
+trace_logger.setLevel(logging.INFO)
+trace_logger.propagate = False
+
+# On-demand profiler: /api/profiler only exists when PROFILER_TOKEN is set
+PROFILER_TOKEN = os.getenv('PROFILER_TOKEN', '')
+PROFILER_PATH = '/api/profiler'
+profiler = SamplingProfiler(
+    interval=float(os.getenv('PROFILER_INTERVAL_MS', '5')) / 1000,
+    max_seconds=float(os.getenv('PROFILER_MAX_SECONDS', '60')),
+    track_threads=True
+)
+
 # Initialize MediaPipe Pose using the new tasks API
 BaseOptions = mp.tasks.BaseOptions
 PoseLandmarker = mp.tasks.vision.PoseLandmarker
 PoseLandmarkerOptions = mp.tasks.vision.PoseLandmarkerOptions
 VisionRunningMode = mp.tasks.vision.RunningMode
 
-# Create pose landmarker
-options = PoseLandmarkerOptions(
-    base_options=BaseOptions(model_asset_path=None),  # Uses default model
-    running_mode=VisionRunningMode.IMAGE,
-    num_poses=1,
-    min_pose_detection_confidence=0.5,
-    min_pose_presence_confidence=0.5,
-    min_tracking_confidence=0.5
-)
+# Number of prefork inference worker processes (0 = run inference in-process)
+AI_WORKERS = int(os.getenv('AI_WORKERS', '0'))
+# Longest a request waits on a worker for pose detection; the backend gives
+# up after AI_MODEL_TIMEOUT, so keep this below it
+AI_DETECT_TIMEOUT = float(os.getenv('AI_DETECT_TIMEOUT', '20'))
 
-try:
-    pose_landmarker = PoseLandmarker.create_from_options(options)
-    print("✓ MediaPipe Pose Landmarker initialized successfully")
-except Exception as e:
-    print(f"⚠️  Could not initialize pose landmarker with model file: {e}")
-    print("⚠️  Will use fallback measurement method")
-    pose_landmarker = None
+# Adaptive resolution cascade: a cheap low-resolution pass first, escalating
+# to a crop around the body, then the full image, only when unsure. Off until
+# benchmark_cascade.py has shown it agrees with the full-resolution path
+POSE_CASCADE = os.getenv('POSE_CASCADE', '0') == '1'
+POSE_LOW_RES = int(os.getenv('POSE_LOW_RES', '256'))  # Long side of the first pass, px
+POSE_MIN_VISIBILITY = float(os.getenv('POSE_MIN_VISIBILITY', '0.8'))
+POSE_MIN_PRESENCE = float(os.getenv('POSE_MIN_PRESENCE', '0.8'))
+POSE_CROP_MARGIN = 0.15  # Added around the landmark bounding box, per side
+POSE_TIERS = ('low', 'crop', 'full')
+
+# Landmarks the measurement formulas read; their quality decides escalation
+KEY_LANDMARKS = [NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, LEFT_HIP, RIGHT_HIP, LEFT_ANKLE]
+
+POSE_TIER_REQUESTS = Counter('pose_cascade_requests_total', 'Pose detections resolved per cascade tier', ['tier'])
+POSE_DETECT_SECONDS = Histogram('pose_detect_seconds', 'Pose detection latency per cascade tier', ['tier'])
+
+def create_pose_landmarker():
+    """Create a pose landmarker, or None if the model cannot be loaded"""
+    options = PoseLandmarkerOptions(
+        base_options=BaseOptions(model_asset_path=None),  # Uses default model
+        running_mode=VisionRunningMode.IMAGE,
+        num_poses=1,
+        min_pose_detection_confidence=0.5,
+        min_pose_presence_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+    
+    try:
+        landmarker = PoseLandmarker.create_from_options(options)
+        print("✓ MediaPipe Pose Landmarker initialized successfully")
+        return landmarker
+    except Exception as e:
+        print(f"⚠️  Could not initialize pose landmarker with model file: {e}")
+        print("⚠️  Will use fallback measurement method")
+        return None
+
+# In worker mode every worker process owns its own landmarker instead
+pose_landmarker = create_pose_landmarker() if AI_WORKERS == 0 else None
 
 class BodyMeasurementAI:
     """AI model for body measurement"""
     
-    def __init__(self):
-        self.pose_landmarker = pose_landmarker
+    def __init__(self, landmarker=None, cascade: bool = POSE_CASCADE):
+        self.pose_landmarker = landmarker if landmarker is not None else pose_landmarker
+        self.cascade = cascade
         
     def decode_image(self, base64_string: str) -> np.ndarray:
         """Decode base64 image to numpy array"""
-        img_data = base64.b64decode(base64_string)
+        return self.decode_image_bytes(base64.b64decode(base64_string))
+    
+    def decode_image_bytes(self, img_data: bytes) -> np.ndarray:
+        """Decode raw image bytes (JPEG, PNG, ...) to numpy array"""
         img = Image.open(io.BytesIO(img_data))
-        return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+        return cv2.cvtColor(np.array(img.convert('RGB')), cv2.COLOR_RGB2BGR)
     
     def detect_pose(self, image: np.ndarray) -> Dict:
-        """Detect pose landmarks using MediaPipe"""
+        """Detect pose landmarks using MediaPipe
+        
+        With the cascade enabled, a downscaled pass is accepted when the key
+        landmarks clear POSE_MIN_VISIBILITY/POSE_MIN_PRESENCE. Otherwise the
+        body found there is cropped from the original image and re-detected,
+        and the full image is the last resort. 'tier' reports which pass won.
+        """
         if self.pose_landmarker is None:
             # Fallback: return None if pose landmarker not available
             return None
+        
+        height, width = image.shape[:2]
+        scale = POSE_LOW_RES / max(height, width)
+        if self.cascade and scale < 1:
+            low = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                             interpolation=cv2.INTER_AREA)
+            landmarks = self._detect_landmarks(low)
+            if landmarks is not None and self._is_confident(landmarks):
+                return self._pose_result(landmarks, 'low')
             
+            if landmarks is not None:
+                x0, y0, x1, y1 = self._body_box(landmarks, width, height)
+                # A crop that is nearly the whole frame is just the full pass
+                if (x1 - x0) * (y1 - y0) < 0.8 * width * height:
+                    cropped = self._detect_landmarks(image[y0:y1, x0:x1])
+                    if cropped is not None:
+                        # Back to coordinates normalized to the full image
+                        cropped[:, 0] = (cropped[:, 0] * (x1 - x0) + x0) / width
+                        cropped[:, 1] = (cropped[:, 1] * (y1 - y0) + y0) / height
+                        cropped[:, 2] *= (x1 - x0) / width
+                        if self._is_confident(cropped):
+                            return self._pose_result(cropped, 'crop')
+        
+        landmarks = self._detect_landmarks(image)
+        if landmarks is None:
+            return None
+        return self._pose_result(landmarks, 'full')
+    
+    def _detect_landmarks(self, image: np.ndarray):
+        """Run the landmarker once; (33, 5) array of x, y, z, visibility, presence"""
         # Convert to RGB for MediaPipe
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         
@@ -70,19 +185,41 @@ class BodyMeasurementAI:
         if not detection_result.pose_landmarks or len(detection_result.pose_landmarks) == 0:
             return None
         
-        # Extract landmarks from first detected pose
-        landmarks = []
-        for landmark in detection_result.pose_landmarks[0]:
-            landmarks.append({
-                'x': landmark.x,
-                'y': landmark.y,
-                'z': landmark.z,
-                'visibility': landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-            })
-        
+        # Extract landmarks from first detected pose (scores the model omits count as 1.0)
+        return np.array([
+            (landmark.x, landmark.y, landmark.z,
+             *(1.0 if score is None else score
+               for score in (getattr(landmark, 'visibility', None), getattr(landmark, 'presence', None))))
+            for landmark in detection_result.pose_landmarks[0]
+        ], dtype=np.float32)
+    
+    @staticmethod
+    def _is_confident(landmarks: np.ndarray) -> bool:
+        key = landmarks[KEY_LANDMARKS]
+        return key[:, 3].mean() >= POSE_MIN_VISIBILITY and key[:, 4].mean() >= POSE_MIN_PRESENCE
+    
+    @staticmethod
+    def _body_box(landmarks: np.ndarray, width: int, height: int):
+        """Pixel box around all landmarks plus POSE_CROP_MARGIN, clipped to the image"""
+        x_min, y_min = landmarks[:, :2].min(axis=0)
+        x_max, y_max = landmarks[:, :2].max(axis=0)
+        margin_x = (x_max - x_min) * POSE_CROP_MARGIN
+        margin_y = (y_max - y_min) * POSE_CROP_MARGIN
+        x0 = int(np.clip((x_min - margin_x) * width, 0, width - 1))
+        y0 = int(np.clip((y_min - margin_y) * height, 0, height - 1))
+        x1 = int(np.clip(np.ceil((x_max + margin_x) * width), x0 + 1, width))
+        y1 = int(np.clip(np.ceil((y_max + margin_y) * height), y0 + 1, height))
+        return x0, y0, x1, y1
+    
+    @staticmethod
+    def _pose_result(landmarks: np.ndarray, tier: str) -> Dict:
         return {
-            'landmarks': landmarks,
-            'pose_detected': True
+            'landmarks': [
+                {'x': float(x), 'y': float(y), 'z': float(z), 'visibility': float(visibility)}
+                for x, y, z, visibility, _ in landmarks
+            ],
+            'pose_detected': True,
+            'tier': tier
         }
     
     def calculate_distance(self, point1: Dict, point2: Dict, image_height: int) -> float:
@@ -93,140 +230,214 @@ class BodyMeasurementAI:
         pixel_distance = np.sqrt((x2 - x1)**2 + (y2 - y1)**2) * image_height
         return pixel_distance
     
-    def estimate_measurements(self, landmarks: List[Dict], gender: str, 
+    def estimate_measurements(self, landmark_array: np.ndarray, gender: str, 
                             image_height: int, reference_scale: float = 170.0) -> Dict:
-        """Estimate body measurements from landmarks"""
-        
-        # Key landmark indices (MediaPipe Pose)
-        NOSE = 0
-        LEFT_SHOULDER = 11
-        RIGHT_SHOULDER = 12
-        LEFT_HIP = 23
-        RIGHT_HIP = 24
-        LEFT_ANKLE = 27
-        RIGHT_ANKLE = 28
-        LEFT_WRIST = 15
-        RIGHT_WRIST = 16
-        
-        measurements = {}
-        
-        # Height (nose to ankle) - normalized to reference_scale (default 170cm)
-        height_pixels = self.calculate_distance(
-            landmarks[NOSE], 
-            landmarks[LEFT_ANKLE], 
-            image_height
+        """Estimate body measurements from a (33, 4) landmarks_to_array array"""
+        batch = estimate_batch(
+            landmark_array[np.newaxis],
+            is_male=np.array([gender == 'male']),
+            reference_heights=np.array([reference_scale]),
+            image_heights=np.array([image_height])
         )
         
-        # Use height as reference for scaling
-        scale_factor = reference_scale / height_pixels if height_pixels > 0 else 1.0
-        
-        measurements['height'] = reference_scale
-        
-        # Shoulder width
-        shoulder_width_pixels = self.calculate_distance(
-            landmarks[LEFT_SHOULDER],
-            landmarks[RIGHT_SHOULDER],
-            image_height
-        )
-        measurements['shoulder_width'] = shoulder_width_pixels * scale_factor
-        
-        # Hip width
-        hip_width_pixels = self.calculate_distance(
-            landmarks[LEFT_HIP],
-            landmarks[RIGHT_HIP],
-            image_height
-        )
-        measurements['hip'] = hip_width_pixels * scale_factor * 3.14  # Approximate circumference
-        
-        # Arm length (shoulder to wrist)
-        arm_length_pixels = self.calculate_distance(
-            landmarks[LEFT_SHOULDER],
-            landmarks[LEFT_WRIST],
-            image_height
-        )
-        measurements['arm_length'] = arm_length_pixels * scale_factor
-        
-        # Gender-specific measurements
-        if gender == 'male':
-            # Chest approximation (shoulder width * 2.5)
-            measurements['chest'] = measurements['shoulder_width'] * 2.5
-            measurements['waist'] = measurements['hip'] * 0.75
-            measurements['inseam'] = measurements['height'] * 0.45
-            measurements['outseam'] = measurements['height'] * 0.58
-        else:  # female
-            # Bust approximation (shoulder width * 2.3)
-            measurements['bust'] = measurements['shoulder_width'] * 2.3
-            measurements['under_bust'] = measurements['bust'] * 0.85
-            measurements['waist'] = measurements['hip'] * 0.70
-        
-        # Calculate confidence score
-        avg_visibility = np.mean([lm['visibility'] for lm in landmarks])
-        confidence = min(avg_visibility, 0.95)  # Cap at 95%
-        
-        # Determine size recommendation
-        if gender == 'male':
-            chest = measurements.get('chest', 0)
-            if chest < 90:
-                size = 'S'
-            elif chest < 100:
-                size = 'M'
-            elif chest < 110:
-                size = 'L'
-            else:
-                size = 'XL'
-        else:
-            bust = measurements.get('bust', 0)
-            if bust < 80:
-                size = 'XS'
-            elif bust < 88:
-                size = 'S'
-            elif bust < 96:
-                size = 'M'
-            elif bust < 104:
-                size = 'L'
-            else:
-                size = 'XL'
+        names = MALE_MEASUREMENTS if gender == 'male' else FEMALE_MEASUREMENTS
+        measurements = {name: float(batch[name][0]) for name in names}
         
         return {
             'measurements': measurements,
-            'confidence': confidence,
-            'size_recommendation': size
+            'confidence': float(batch['confidence'][0]),
+            'size_recommendation': str(batch['size'][0])
         }
 
+def landmarks_to_array(landmarks: List[Dict]) -> np.ndarray:
+    """Convert landmark dicts to a (33, 4) float32 array of (x, y, z, visibility)"""
+    return np.array(
+        [(lm['x'], lm['y'], lm['z'], lm['visibility']) for lm in landmarks],
+        dtype=np.float32
+    )
+
 # Initialize AI model
 ai_model = BodyMeasurementAI()
 
+@app.before_request
+def start_trace():
+    """Accept the caller's request id (or create one) and start timing"""
+    request_id = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = request_id if _VALID_REQUEST_ID.match(request_id) else uuid.uuid4().hex
+    g.request_start = time.perf_counter()
+    g.timings = {}
+    g.profiled = profiler.active and request.path != PROFILER_PATH and profiler.request_started()
+
+@contextmanager
+def stage(name: str):
+    """Time an inference stage of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.timings[name] = g.timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+@app.after_request
+def finish_trace(response):
+    """Echo the request id and log slow or sampled requests"""
+    response.headers[REQUEST_ID_HEADER] = g.request_id
+    duration_ms = (time.perf_counter() - g.request_start) * 1000
+    slow = duration_ms >= TRACE_SLOW_REQUEST_MS
+    if slow or random.random() < TRACE_SAMPLE_RATE:
+        trace_logger.log(logging.WARNING if slow else logging.INFO, 'request', extra={
+            'request_id': g.request_id,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'slow': slow,
+            'stages': {name: round(ms, 2) for name, ms in g.timings.items()}
+        })
+    return response
+
+@app.teardown_request
+def finish_profile(exc):
+    """Count the request towards a request-count profiling session"""
+    profiler.request_finished(g.get('profiled', False))
+
+# Prefork worker pool, created on first use so spawned workers never build one
+_inference_pool = None
+_inference_pool_lock = threading.Lock()
+
+def get_inference_pool():
+    """Get the shared worker pool, starting it on first use"""
+    global _inference_pool
+    if _inference_pool is None:
+        with _inference_pool_lock:
+            if _inference_pool is None:
+                from inference_pool import InferencePool
+                _inference_pool = InferencePool(AI_WORKERS)
+                atexit.register(_inference_pool.close)
+    return _inference_pool
+
+def run_pose_detection(image: np.ndarray) -> Dict:
+    """Detect pose in-process or on a worker process, depending on AI_WORKERS"""
+    start = time.perf_counter()
+    if AI_WORKERS == 0:
+        pose_result = ai_model.detect_pose(image)
+    else:
+        from inference_pool import landmarks_to_dicts
+        detected = get_inference_pool().detect(image, timeout=AI_DETECT_TIMEOUT)
+        pose_result = None if detected is None else {
+            'landmarks': landmarks_to_dicts(detected[0]),
+            'pose_detected': True,
+            'tier': detected[1]
+        }
+    
+    if pose_result:
+        POSE_TIER_REQUESTS.labels(tier=pose_result['tier']).inc()
+        POSE_DETECT_SECONDS.labels(tier=pose_result['tier']).observe(time.perf_counter() - start)
+    return pose_result
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (503 once a worker has been given up on)"""
+    workers = _inference_pool.stats() if _inference_pool else {'workers': AI_WORKERS}
+    healthy = workers.get('healthy', True)
     return jsonify({
-        'status': 'healthy',
+        'status': 'healthy' if healthy else 'unhealthy',
         'service': 'Real AI Model Server with MediaPipe',
         'version': '1.0.0',
         'mediapipe_version': mp.__version__,
-        'pose_landmarker_available': pose_landmarker is not None
-    })
+        'pose_landmarker_available': pose_landmarker is not None,
+        'workers': workers
+    }), 200 if healthy else 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics (cascade tier shares and latency)"""
+    return generate_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+@app.route(PROFILER_PATH, methods=['GET', 'POST', 'DELETE'])
+def profile():
+    """Start a sampling profiler session (POST), fetch its results (GET) or
+    end it early (DELETE)
+    
+    POST {"seconds": N} or {"requests": K}; GET ?format=top|collapsed&limit=N.
+    Requires the X-Profiler-Token header to match PROFILER_TOKEN.
+    """
+    token = request.headers.get('X-Profiler-Token', '')
+    if not PROFILER_TOKEN:
+        return jsonify({'error': 'Not found'}), 404
+    if not hmac.compare_digest(token.encode(), PROFILER_TOKEN.encode()):
+        return jsonify({'error': 'Invalid profiler token'}), 403
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        seconds, count = data.get('seconds'), data.get('requests')
+        if (seconds is None) == (count is None):
+            return jsonify({'error': "Give exactly one of 'seconds' or 'requests'"}), 400
+        try:
+            if seconds is not None:
+                profiler.start_timed(float(seconds))
+            else:
+                profiler.start_requests(int(count))
+        except (TypeError, ValueError):
+            return jsonify({'error': "'seconds' and 'requests' must be numbers"}), 400
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+        return jsonify(profiler.status()), 202
+    
+    if request.method == 'DELETE':
+        if not profiler.cancel():
+            return jsonify({'error': 'No profiling session is running'}), 409
+        return jsonify(profiler.status())
+    
+    result = profiler.status()
+    if result['state'] != 'finished':
+        return jsonify(result)
+    if request.args.get('format') == 'collapsed':
+        return profiler.collapsed(), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+    limit = request.args.get('limit', '50')
+    if not limit.isdigit() or not 1 <= int(limit) <= 1000:
+        return jsonify({'error': "'limit' must be a whole number from 1 to 1000"}), 400
+    return jsonify({**result, 'functions': profiler.top(int(limit))})
 
 @app.route('/api/measure', methods=['POST'])
 def measure_body():
-    """Process image and return measurements"""
+    """Process image and return measurements
+    
+    Accepts either a JSON body with a base64 'image', or the raw image bytes
+    as the request body with gender/reference_height in the query string.
+    """
     try:
-        data = request.json
-        
-        # Validate input
-        if 'image' not in data:
-            return jsonify({'error': 'No image provided'}), 400
+        if request.is_json:
+            data = request.json
+            
+            # Validate input
+            if 'image' not in data:
+                return jsonify({'error': 'No image provided'}), 400
+        else:
+            data = request.args.to_dict()
+            raw_image = request.get_data(cache=False)
+            if not raw_image:
+                return jsonify({'error': 'No image provided'}), 400
         
         gender = data.get('gender', 'male')
         if gender not in ['male', 'female']:
             return jsonify({'error': 'Invalid gender'}), 400
         
         # Decode image
-        image = ai_model.decode_image(data['image'])
+        with stage('decode'):
+            if request.is_json:
+                image = ai_model.decode_image(data['image'])
+            else:
+                image = ai_model.decode_image_bytes(raw_image)
         image_height = image.shape[0]
         
         # Detect pose
-        pose_result = ai_model.detect_pose(image)
+        try:
+            with stage('detect_pose'):
+                pose_result = run_pose_detection(image)
+        except FutureTimeoutError:
+            return jsonify({'error': 'Pose detection timed out', 'success': False}), 504
+        except WorkerCrashedError as e:
+            return jsonify({'error': str(e), 'success': False}), 503
         
         if not pose_result:
             return jsonify({
@@ -236,12 +447,14 @@ def measure_body():
             }), 400
         
         # Calculate measurements
-        result = ai_model.estimate_measurements(
-            pose_result['landmarks'],
-            gender,
-            image_height,
-            reference_scale=data.get('reference_height', 170.0)
-        )
+        with stage('estimate'):
+            landmark_array = landmarks_to_array(pose_result['landmarks'])
+            result = ai_model.estimate_measurements(
+                landmark_array,
+                gender,
+                image_height,
+                reference_scale=float(data.get('reference_height', 170.0))
+            )
         
         return jsonify({
             'success': True,
@@ -250,6 +463,11 @@ def measure_body():
             'size_recommendation': result['size_recommendation'],
             'gender': gender,
             'pose_detected': True,
+            'pose_tier': pose_result['tier'],
+            'model_version': MODEL_VERSION,
+            # Packed float32[33][4] (x, y, z, visibility), so measurements can be recomputed later
+            'landmarks': base64.b64encode(pack_landmarks(landmark_array)).decode('ascii'),
+            'timings_ms': {name: round(ms, 2) for name, ms in g.timings.items()},
             'message': 'Real AI measurements using MediaPipe pose detection'
         })
         
@@ -266,5 +484,6 @@ if __name__ == '__main__':
     print(f"📊 MediaPipe version: {mp.__version__}")
     print(f"📍 Server running at: http://localhost:5000")
     print(f"🔧 Pose Landmarker: {'Available' if pose_landmarker else 'Not Available (using fallback)'}")
+    print(f"⚙️  Inference workers: {AI_WORKERS or 'in-process'}")
     print("=" * 60)
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,112 @@
+"""
+Inference Pool Tests
+Worker crash handling: restarts, failed in-flight jobs, timeouts and the
+restart cap
+
+Run from ai_model/: python -m pytest tests
+"""
+
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import numpy as np
+import pytest
+
+# Keep serve_model from creating a landmarker in the test process
+os.environ.setdefault('AI_WORKERS', '1')
+
+from inference_pool import InferencePool, WorkerCrashedError
+
+IMAGE = np.zeros((64, 48, 3), dtype=np.uint8)
+
+# Worker start-up imports MediaPipe, which takes a few seconds
+STARTUP_TIMEOUT = 60
+
+
+def wait_for(condition, timeout: float = STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def kill_worker(pool: InferencePool, worker_id: int):
+    process = pool._workers[worker_id]
+    os.kill(process.pid, signal.SIGKILL)
+    process.join(5)
+
+
+@pytest.fixture
+def pool():
+    pool = InferencePool(2, monitor_interval=0.1, restart_backoff=0.1)
+    yield pool
+    pool.close()
+
+
+def test_detect_succeeds_after_worker_killed(pool):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: pool.detect(IMAGE, timeout=STARTUP_TIMEOUT), range(4)))
+
+        kill_worker(pool, 0)
+        wait_for(lambda: pool.stats()['restarts'] == 1 and pool.stats()['alive'] == 2)
+
+        # Concurrent detects reach both the restarted and the untouched worker
+        results = list(executor.map(lambda _: pool.detect(IMAGE, timeout=STARTUP_TIMEOUT),
+                                    range(8)))
+
+    assert results == [None] * 8  # No landmarker in the test environment
+    stats = pool.stats()
+    assert stats['in_flight'] == 0
+    assert stats['healthy']
+
+
+def test_timed_out_jobs_do_not_kill_workers(pool):
+    for _ in range(4):
+        # Times out before any worker can have picked the job up
+        with pytest.raises(FutureTimeoutError):
+            pool.detect(IMAGE, timeout=0)
+    assert pool.stats()['in_flight'] == 0
+
+    # The workers still find the buffers, answer and free them
+    wait_for(lambda: not pool._abandoned)
+    assert pool.detect(IMAGE, timeout=STARTUP_TIMEOUT) is None
+    stats = pool.stats()
+    assert stats['alive'] == 2
+    assert stats['restarts'] == 0
+
+
+def test_in_flight_job_fails_when_worker_dies():
+    pool = InferencePool(1, monitor_interval=0.1, restart_backoff=0.1)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Queued while the worker is still starting up
+            future = executor.submit(pool.detect, IMAGE, STARTUP_TIMEOUT)
+            wait_for(lambda: pool.stats()['in_flight'] == 1)
+
+            kill_worker(pool, 0)
+            start = time.monotonic()
+            with pytest.raises(WorkerCrashedError):
+                future.result(timeout=10)
+            assert time.monotonic() - start < 5
+    finally:
+        pool.close()
+
+
+def test_worker_given_up_after_repeated_crashes():
+    pool = InferencePool(1, monitor_interval=0.1, restart_backoff=0.1, max_restarts=1)
+    try:
+        kill_worker(pool, 0)
+        wait_for(lambda: pool.stats()['restarts'] == 1 and pool.stats()['alive'] == 1)
+        kill_worker(pool, 0)
+        wait_for(lambda: not pool.stats()['healthy'], timeout=10)
+
+        time.sleep(0.5)
+        stats = pool.stats()
+        assert stats['failed'] == [0]
+        assert stats['restarts'] == 1
+        with pytest.raises(WorkerCrashedError):
+            pool.detect(IMAGE, timeout=1)
+    finally:
+        pool.close()
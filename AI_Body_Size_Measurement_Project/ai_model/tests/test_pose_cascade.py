@@ -0,0 +1,98 @@
+"""
+Pose Cascade Tests
+Tier selection in BodyMeasurementAI.detect_pose and the mapping of crop
+landmarks back to the full image, with a stub landmarker
+
+Run from ai_model/: python -m pytest tests
+"""
+
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Keep serve_model from creating a landmarker in the test process
+os.environ.setdefault('AI_WORKERS', '1')
+
+from serve_model import POSE_LOW_RES, BodyMeasurementAI
+
+# Portrait photo, large enough for the cascade to downscale it
+IMAGE = np.zeros((1000, 600, 3), dtype=np.uint8)
+
+SURE, UNSURE = 0.95, 0.3
+
+
+def pose(x_min, y_min, x_max, y_max, score):
+    """33 landmarks spread over a box (normalized coordinates), all with one score"""
+    xs = np.linspace(x_min, x_max, 33)
+    ys = np.linspace(y_min, y_max, 33)
+    return [SimpleNamespace(x=x, y=y, z=0.1, visibility=score, presence=score) for x, y in zip(xs, ys)]
+
+
+class StubLandmarker:
+    """Answers each detect() call with the next scripted pose, recording input sizes"""
+
+    def __init__(self, *poses):
+        self.poses = list(poses)
+        self.sizes = []
+
+    def detect(self, mp_image):
+        self.sizes.append((mp_image.height, mp_image.width))
+        landmarks = self.poses.pop(0)
+        return SimpleNamespace(pose_landmarks=[landmarks] if landmarks else [])
+
+
+def detect(*poses, cascade=True):
+    landmarker = StubLandmarker(*poses)
+    result = BodyMeasurementAI(landmarker, cascade=cascade).detect_pose(IMAGE)
+    assert not landmarker.poses, "scripted poses left unused"
+    return result, landmarker.sizes
+
+
+def test_confident_low_res_pass_is_accepted():
+    result, sizes = detect(pose(0.4, 0.2, 0.6, 0.8, SURE))
+    assert result['tier'] == 'low'
+    assert sizes == [(POSE_LOW_RES, round(600 * POSE_LOW_RES / 1000))]
+
+
+def test_unsure_low_res_pass_escalates_to_crop():
+    result, sizes = detect(pose(0.4, 0.2, 0.6, 0.8, UNSURE), pose(0.0, 0.0, 1.0, 1.0, SURE))
+    assert result['tier'] == 'crop'
+
+    # The crop is the low-res body box plus its margin, in original pixels
+    low = np.array([(lm.x, lm.y) for lm in pose(0.4, 0.2, 0.6, 0.8, UNSURE)], dtype=np.float32)
+    x0, y0, x1, y1 = BodyMeasurementAI._body_box(low, 600, 1000)
+    assert sizes[1] == (y1 - y0, x1 - x0)
+
+    # The crop's corners land on the box corners of the full image
+    first, last = result['landmarks'][0], result['landmarks'][-1]
+    assert (first['x'], first['y']) == pytest.approx((x0 / 600, y0 / 1000))
+    assert (last['x'], last['y']) == pytest.approx((x1 / 600, y1 / 1000))
+    assert first['z'] == pytest.approx(0.1 * (x1 - x0) / 600)
+
+
+def test_unsure_crop_falls_back_to_full_image():
+    result, sizes = detect(pose(0.4, 0.2, 0.6, 0.8, UNSURE), pose(0.0, 0.0, 1.0, 1.0, UNSURE),
+                           pose(0.4, 0.2, 0.6, 0.8, UNSURE))
+    assert result['tier'] == 'full'
+    assert sizes[-1] == (1000, 600)
+    assert result['landmarks'][0]['x'] == pytest.approx(0.4)
+
+
+def test_body_filling_the_frame_skips_the_crop():
+    result, sizes = detect(pose(0.0, 0.0, 1.0, 1.0, UNSURE), pose(0.0, 0.0, 1.0, 1.0, SURE))
+    assert result['tier'] == 'full'
+    assert len(sizes) == 2
+
+
+def test_no_pose_at_low_res_goes_to_full_image():
+    result, sizes = detect(None, pose(0.4, 0.2, 0.6, 0.8, SURE))
+    assert result['tier'] == 'full'
+    assert sizes[-1] == (1000, 600)
+
+
+def test_cascade_off_runs_the_full_image_only():
+    result, sizes = detect(pose(0.4, 0.2, 0.6, 0.8, SURE), cascade=False)
+    assert result['tier'] == 'full'
+    assert sizes == [(1000, 600)]
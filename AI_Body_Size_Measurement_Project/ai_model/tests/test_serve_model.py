@@ -0,0 +1,60 @@
+"""
+AI Server Route Tests
+Error responses of /api/measure and /api/profiler
+
+Run from ai_model/: python -m pytest tests
+"""
+
+import os
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import cv2
+import numpy as np
+import pytest
+
+# Keep serve_model from creating a landmarker in the test process
+os.environ.setdefault('AI_WORKERS', '1')
+
+import serve_model
+from inference_pool import WorkerCrashedError
+
+
+@pytest.fixture
+def client():
+    return serve_model.app.test_client()
+
+
+def measure(client):
+    _, jpeg = cv2.imencode('.jpg', np.zeros((64, 48, 3), dtype=np.uint8))
+    return client.post('/api/measure?gender=male', data=jpeg.tobytes(),
+                       content_type='image/jpeg')
+
+
+@pytest.mark.parametrize('error, status', [
+    (FutureTimeoutError(), 504),
+    (WorkerCrashedError("No inference workers are running"), 503),
+])
+def test_detection_failures_map_to_gateway_errors(client, monkeypatch, error, status):
+    def failing_detection(image):
+        raise error
+
+    monkeypatch.setattr(serve_model, 'run_pose_detection', failing_detection)
+    response = measure(client)
+    assert response.status_code == status
+    assert response.get_json()['success'] is False
+
+
+@pytest.mark.parametrize('method, kwargs', [
+    ('get', {'query_string': {'limit': 'ten'}}),
+    ('get', {'query_string': {'limit': '0'}}),
+    ('post', {'json': {'requests': 'ten'}}),
+])
+def test_profiler_rejects_bad_numbers(client, monkeypatch, method, kwargs):
+    monkeypatch.setattr(serve_model, 'PROFILER_TOKEN', 'secret')
+    monkeypatch.setattr(serve_model, 'profiler', serve_model.SamplingProfiler(interval=0.001, max_seconds=5))
+    headers = {'X-Profiler-Token': 'secret'}
+    serve_model.profiler.start_timed(0.01)
+    serve_model.profiler.cancel()
+
+    response = getattr(client, method)(serve_model.PROFILER_PATH, headers=headers, **kwargs)
+    assert response.status_code == 400
@@ -3,26 +3,55 @@ AI Body Measurement System - Main Application
 FastAPI Backend Server
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+import time
+
+_boot_start = time.perf_counter()
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
-import uvicorn
 
 # Import routes
-from routes import user_routes, measurement_routes, admin_routes
-from config.database import engine, Base
+from routes import user_routes, measurement_routes, profile_routes, admin_routes
+from config.database import engine
+from config.schema import ensure_schema
 from config.settings import settings
+from services.ai_service import close_ai_client
+from services.audit_service import audit_writer
+from services.idempotency_service import close_idempotency_store
+from services.password_service import shutdown_hash_executor
+from middleware.tracing import TracingMiddleware, configure_logging
+from middleware.db_metrics import DBMetricsMiddleware, instrument_engine
+from middleware.profiler import ProfilerMiddleware
+from middleware.rate_limit import AdmissionControlMiddleware, create_token_bucket_store
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+configure_logging()
+instrument_engine(engine)
+
+rate_limit_store = create_token_bucket_store()
+
+_import_ms = (time.perf_counter() - _boot_start) * 1000
 
-# Create database tables
+# Check the schema version instead of inspecting every table on each boot
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting AI Body Measurement System...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created")
+    phase_start = time.perf_counter()
+    version = ensure_schema(engine)
+    schema_ms = (time.perf_counter() - phase_start) * 1000
+    print(f"✅ Database schema at revision {version}")
+    await audit_writer.start()
+    print(f"⏱️  Startup: imports {_import_ms:.0f} ms, schema check {schema_ms:.0f} ms, "
+          f"total {(time.perf_counter() - _boot_start) * 1000:.0f} ms")
     yield
     # Shutdown
+    await audit_writer.stop()  # Writes any events still queued
+    await close_ai_client()
+    await close_idempotency_store()
+    shutdown_hash_executor()
+    await rate_limit_store.close()
     print("👋 Shutting down...")
 
 # Initialize FastAPI app
@@ -35,6 +64,9 @@ app = FastAPI(
     redoc_url="/api/redoc"
 )
 
+# Rate and concurrency limits in front of the AI server (inside CORS so 429s carry CORS headers)
+app.add_middleware(AdmissionControlMiddleware, store=rate_limit_store)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -44,9 +76,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# SQL statement counts and pool usage per request
+app.add_middleware(DBMetricsMiddleware)
+
+# Request tracing (times everything below it)
+app.add_middleware(TracingMiddleware)
+
+# Request boundaries for the on-demand profiler (only installed when opted in)
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
 # Include routers
 app.include_router(user_routes.router, prefix="/api/users", tags=["Users"])
 app.include_router(measurement_routes.router, prefix="/api/measurements", tags=["Measurements"])
+app.include_router(profile_routes.router, prefix="/api/profiles", tags=["Profiles"])
 app.include_router(admin_routes.router, prefix="/api/admin", tags=["Admin"])
 
 # Health check endpoint
@@ -59,6 +102,12 @@ async def health_check():
         "version": "1.0.0"
     }
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -70,6 +119,7 @@ async def root():
     }
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(
         "app:app",
         host="0.0.0.0",
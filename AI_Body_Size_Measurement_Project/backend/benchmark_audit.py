@@ -0,0 +1,79 @@
+"""
+Audit Writer Benchmark
+Measures the latency an audit event adds to a request handler, compared
+with a synchronous INSERT per event, and the writer's flush throughput.
+
+Runs in-process with a simulated database write, no services needed.
+Usage: python benchmark_audit.py [events] [insert_ms]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from services.audit_service import AuditWriter
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {p: samples[min(len(samples) - 1, int(len(samples) * p / 100))] for p in (50, 99)}
+
+
+def report(name: str, samples):
+    p = percentiles(samples)
+    print(f"{name:<22} mean {statistics.mean(samples):8.1f} us   "
+          f"p50 {p[50]:8.1f} us   p99 {p[99]:8.1f} us")
+
+
+async def run(events: int, insert_ms: float):
+    batches = []
+
+    def write_batch(rows):
+        # One round trip per batch, whatever its size
+        time.sleep(insert_ms / 1000)
+        batches.append(len(rows))
+
+    # Baseline: the handler awaits one INSERT per event
+    sync_samples = []
+    for i in range(min(events, 200)):
+        start = time.perf_counter()
+        await asyncio.to_thread(write_batch, [{}])
+        sync_samples.append((time.perf_counter() - start) * 1e6)
+    batches.clear()
+
+    writer = AuditWriter(write_batch=write_batch, max_queue=events)
+    await writer.start()
+
+    samples = []
+    start_all = time.perf_counter()
+    for i in range(events):
+        start = time.perf_counter()
+        writer.record("measurement.capture", "measurement",
+                      new_values={"general_size": "M", "index": i})
+        samples.append((time.perf_counter() - start) * 1e6)
+        if i % 100 == 0:
+            await asyncio.sleep(0)  # Let the flusher run, as between real requests
+
+    await writer.stop()
+    elapsed = time.perf_counter() - start_all
+
+    report("Synchronous INSERT", sync_samples)
+    report("Buffered record()", samples)
+    print(f"Wrote {sum(batches):,} events in {len(batches)} batches "
+          f"({sum(batches) / elapsed:,.0f} events/s including drain)")
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    insert_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    print("=" * 60)
+    print(f"Audit writer: {events:,} events, {insert_ms} ms per INSERT round trip")
+    print("=" * 60)
+    asyncio.run(run(events, insert_ms))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
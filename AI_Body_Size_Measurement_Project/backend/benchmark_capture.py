@@ -0,0 +1,87 @@
+"""
+Capture Proxy Memory Benchmark
+Measures peak backend memory per in-flight capture under concurrent load,
+comparing the streamed proxy with buffering the image as base64 JSON.
+
+Runs in-process against a stub AI server transport, no services needed.
+Usage: python benchmark_capture.py [concurrency] [image_mb]
+"""
+
+import asyncio
+import base64
+import json
+import sys
+import tracemalloc
+
+import httpx
+
+from config.settings import settings
+from services.ai_service import AIServiceClient
+
+CHUNK_SIZE = 64 * 1024
+
+STUB_RESULT = {
+    'success': True,
+    'measurements': {'height': 170.0},
+    'confidence': 0.9,
+    'size_recommendation': 'M'
+}
+
+
+class StubAIServer(httpx.AsyncBaseTransport):
+    """Drains the request body like the AI server would, without keeping it"""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        async for _ in request.stream:
+            pass
+        return httpx.Response(200, json=STUB_RESULT)
+
+
+async def upload(size: int):
+    """Simulate an incoming request body arriving in network-sized chunks"""
+    chunk = b"\xff" * CHUNK_SIZE
+    sent = 0
+    while sent < size:
+        await asyncio.sleep(0)
+        yield chunk[:size - sent]
+        sent += CHUNK_SIZE
+
+
+async def streamed(client: AIServiceClient, size: int):
+    await client.measure_stream(upload(size), gender='male', reference_scale=170.0,
+                                content_length=size)
+
+
+async def buffered(client: AIServiceClient, size: int):
+    body = b"".join([chunk async for chunk in upload(size)])
+    payload = json.dumps({'image': base64.b64encode(body).decode(), 'gender': 'male'})
+    await client._client.post("/api/measure", content=payload.encode())
+
+
+async def measure(proxy, concurrency: int, size: int) -> int:
+    client = AIServiceClient(base_url="http://ai", transport=StubAIServer())
+    tracemalloc.start()
+    await asyncio.gather(*(proxy(client, size) for _ in range(concurrency)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await client.close()
+    return peak
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    image_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 8
+    size = int(image_mb * 1024 * 1024)
+    settings.MAX_UPLOAD_SIZE = max(settings.MAX_UPLOAD_SIZE, size)
+
+    print("=" * 60)
+    print(f"{concurrency} concurrent captures of {image_mb} MB")
+    print("=" * 60)
+    for name, proxy in (("buffered base64", buffered), ("streamed", streamed)):
+        peak = asyncio.run(measure(proxy, concurrency, size))
+        print(f"{name:16s} peak={peak / 2**20:8.1f} MB  "
+              f"per capture={peak / concurrency / 2**20:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measurement History Benchmark
+Latency and SQL query counts for history pages of 10/100/1000 rows,
+eager loading vs. the lazy relationships serializers would otherwise hit.
+
+Seeds a throwaway user in DATABASE_URL and deletes it afterwards;
+DATABASE_URL=sqlite:// runs it without a database server.
+Usage: python benchmark_history.py [repeats]
+"""
+
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from config.database import SessionLocal, engine
+from config.schema import ensure_schema
+from models.user import User
+from models.measurement import Measurement, MeasurementProfile, SizeRecommendation
+from services.measurement_service import query_measurement_history
+
+PAGE_SIZES = (10, 100, 1000)
+
+statement_count = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global statement_count
+    statement_count += 1
+
+
+def seed(db, rows: int) -> User:
+    user = User(email=f"bench-{uuid.uuid4().hex}@example.com", password_hash="x",
+                gender="male")
+    profile = MeasurementProfile(user=user, profile_name="Self", gender="male")
+    now = datetime.utcnow()
+    for i in range(rows):
+        measurement = Measurement(user=user, profile=profile, gender="male",
+                                  height=175, chest=98, waist=82, hip=96,
+                                  measurement_date=now - timedelta(hours=i))
+        measurement.size_recommendations.append(SizeRecommendation(general_size="M"))
+    db.add(user)
+    db.commit()
+    return user
+
+
+def serialize(measurements):
+    """Touch the nested fields a history response needs"""
+    return [
+        (m.id, m.profile.profile_name if m.profile else None,
+         [r.general_size for r in m.size_recommendations])
+        for m in measurements
+    ]
+
+
+def lazy_history(db, user_id, limit):
+    return (
+        db.query(Measurement)
+        .filter(Measurement.user_id == user_id)
+        .order_by(Measurement.measurement_date.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def run(loader, user_id, limit: int, repeats: int):
+    global statement_count
+    timings = []
+    for _ in range(repeats):
+        db = SessionLocal()
+        statement_count = 0
+        start = time.perf_counter()
+        serialize(loader(db, user_id, limit))
+        timings.append((time.perf_counter() - start) * 1000)
+        queries = statement_count
+        db.close()
+    timings.sort()
+    return timings[len(timings) // 2], queries
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    ensure_schema(engine)
+    db = SessionLocal()
+    user = seed(db, max(PAGE_SIZES))
+    user_id = user.id
+    db.close()
+
+    loaders = (
+        ("lazy", lazy_history),
+        ("eager", lambda db, user_id, limit: query_measurement_history(db, user_id, limit=limit)),
+    )
+    try:
+        print("=" * 60)
+        for limit in PAGE_SIZES:
+            for name, loader in loaders:
+                median_ms, queries = run(loader, user_id, limit, repeats)
+                print(f"rows={limit:5d} {name:6s} median={median_ms:9.2f} ms  queries={queries}")
+        print("=" * 60)
+    finally:
+        db = SessionLocal()
+        db.delete(db.get(User, user_id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Capture Retry Benchmark
+Counts inference runs when clients retry captures, with and without an
+Idempotency-Key, as a flaky mobile network would cause.
+
+Runs in-process with a simulated inference job, no services needed.
+Usage: python benchmark_idempotency.py [captures] [attempts_per_capture] [inference_ms]
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+from services.idempotency_service import (
+    IdempotencyInProgress, InMemoryIdempotencyStore, fingerprint, run_once
+)
+
+IMAGE = b"\xff" * (256 * 1024)
+
+
+async def body():
+    for offset in range(0, len(IMAGE), 64 * 1024):
+        await asyncio.sleep(0)
+        yield IMAGE[offset:offset + 64 * 1024]
+
+
+async def run(captures: int, attempts: int, inference_ms: float, idempotent: bool):
+    store = InMemoryIdempotencyStore()
+    inferences = 0
+
+    async def job(chunks):
+        nonlocal inferences
+        async for _ in chunks:
+            pass
+        inferences += 1
+        run_id = inferences
+        await asyncio.sleep(inference_ms / 1000)
+        return {"id": run_id, "general_size": "M"}
+
+    async def attempt(capture: int):
+        # Retries arrive while the first attempt is still in flight, and after it
+        await asyncio.sleep(random.uniform(0, 2 * inference_ms / 1000))
+        if not idempotent:
+            return await job(body())
+        while True:
+            try:
+                body_json, _ = await run_once(store, f"capture:user:{capture}",
+                                              fingerprint("male", None, 170.0), body(), job)
+                return body_json
+            except IdempotencyInProgress as e:
+                # A 409 for a key still in flight: honour Retry-After and try again
+                await asyncio.sleep(e.retry_after)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(attempt(capture)
+                                     for capture in range(captures)
+                                     for _ in range(attempts)))
+    elapsed = time.perf_counter() - start
+    distinct = len({result["id"] for result in results})
+    return inferences, distinct, elapsed
+
+
+def main():
+    captures = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    attempts = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    inference_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 50.0
+
+    print("=" * 60)
+    print(f"Capture retries: {captures} captures x {attempts} attempts, {inference_ms} ms inference")
+    print("=" * 60)
+    for name, idempotent in (("No key", False), ("Idempotency-Key", True)):
+        inferences, distinct, elapsed = asyncio.run(run(captures, attempts, inference_ms, idempotent))
+        print(f"{name:<16} {inferences:5d} inference runs, {inferences - captures:5d} duplicates, "
+              f"{distinct:5d} distinct responses ({elapsed:.2f} s)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
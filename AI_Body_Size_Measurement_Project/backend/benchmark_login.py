@@ -0,0 +1,91 @@
+"""
+Login Storm Benchmark
+Measures the latency of an unrelated endpoint while a burst of logins is
+being verified, with bcrypt run inline on the event loop versus in the
+bounded hashing pool.
+
+Runs in-process against a minimal ASGI app, no services needed.
+Set BCRYPT_ROUNDS / PASSWORD_HASH_WORKERS to compare settings.
+Usage: python benchmark_login.py [logins]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from config.settings import settings
+from services.password_service import pwd_context, verify_password
+
+PROBE_INTERVAL = 0.01
+
+
+def build_app(password_hash: str, inline: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if inline:
+            valid = pwd_context.verify("correct horse", password_hash)
+        else:
+            valid, _ = await verify_password("correct horse", password_hash)
+        return {"valid": valid}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def storm(app: FastAPI, logins: int):
+    """Fire logins concurrently while probing /health at a fixed rate"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        probes = []
+        done = asyncio.Event()
+
+        async def probe():
+            # Latency is counted from when each probe was due, so time spent
+            # waiting for a blocked event loop shows up
+            due = time.perf_counter()
+            while True:
+                await client.get("/health")
+                probes.append((time.perf_counter() - due) * 1000)
+                if done.is_set():
+                    break
+                due += PROBE_INTERVAL
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(client.post("/login") for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+    return elapsed, probes
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    password_hash = pwd_context.hash("correct horse")
+
+    print("=" * 60)
+    print(f"Login storm: {logins} concurrent logins, bcrypt cost {settings.BCRYPT_ROUNDS}, "
+          f"{settings.PASSWORD_HASH_WORKERS} hashing threads")
+    print("=" * 60)
+    for name, inline in (("Inline (event loop)", True), ("Hashing pool", False)):
+        elapsed, probes = asyncio.run(storm(build_app(password_hash, inline), logins))
+        probes.sort()
+        p99 = probes[min(len(probes) - 1, int(len(probes) * 0.99))]
+        print(f"{name:<20} storm {elapsed:6.2f} s ({logins / elapsed:5.1f} logins/s)   "
+              f"/health {len(probes):4d} probes, p50 {statistics.median(probes):7.1f} ms, "
+              f"p99 {p99:7.1f} ms, max {probes[-1]:7.1f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Backend Cold Start Benchmark
+Measures time from a fresh interpreter to the API being ready to serve
+(import of app.py plus the lifespan startup), and the slowest imports.
+
+Needs DATABASE_URL to point at a migrated database, or DATABASE_URL=sqlite://
+to measure against an in-memory SQLite database.
+Usage: python benchmark_startup.py [runs]
+"""
+
+import re
+import statistics
+import subprocess
+import sys
+
+READY_SCRIPT = """
+import asyncio, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.lifespan(app.app):
+        pass
+
+asyncio.run(boot())
+print(f"RESULT {(imported - start) * 1000:.1f} {(time.perf_counter() - start) * 1000:.1f}")
+"""
+
+
+def cold_start():
+    output = subprocess.run([sys.executable, "-c", READY_SCRIPT], capture_output=True,
+                            text=True, check=True).stdout
+    import_ms, ready_ms = re.search(r"RESULT (\S+) (\S+)", output).groups()
+    return float(import_ms), float(ready_ms)
+
+
+def slowest_imports(count: int = 10):
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)", line)
+        if match:
+            rows.append((int(match.group(2)), match.group(4)))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    results = [cold_start() for _ in range(runs)]
+
+    print("=" * 60)
+    print(f"Cold start over {runs} runs (median)")
+    print(f"  import app.py : {statistics.median(r[0] for r in results):8.1f} ms")
+    print(f"  ready to serve: {statistics.median(r[1] for r in results):8.1f} ms")
+    print("=" * 60)
+    print("Slowest imports (cumulative):")
+    for cumulative_us, module in slowest_imports():
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,47 @@
 """
 Database Configuration
-SQLAlchemy setup for PostgreSQL
+SQLAlchemy setup for PostgreSQL, or SQLite for embedded local runs
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from config.settings import settings
+from middleware.db_metrics import InstrumentedQueuePool
+
+
+def engine_options(database_url: str) -> dict:
+    """Connection pool arguments for the database DATABASE_URL selects"""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return {
+            "poolclass": InstrumentedQueuePool,
+            "pool_pre_ping": True,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+        }
+
+    # Sessions run on request and worker threads
+    options = {"connect_args": {"check_same_thread": False}}
+    if url.database in (None, "", ":memory:"):
+        # An in-memory database lives and dies with its connection, so share one
+        options["poolclass"] = StaticPool
+    return options
+
 
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        # SQLite leaves ON DELETE CASCADE / SET NULL off unless asked
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,71 @@
+"""
+Schema Version Check
+Verifies at startup that the database is at the migration this code expects
+"""
+
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from config.settings import settings
+
+# Alembic revision the models match; bump with every new migration
+SCHEMA_VERSION = "0003"
+VERSION_TABLE = "alembic_version"
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database schema does not match the code"""
+
+
+def get_schema_version(engine) -> Optional[str]:
+    """Read the current revision, or None if the database is unversioned"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text(f"SELECT version_num FROM {VERSION_TABLE}")).scalar()
+    except DBAPIError:
+        # Only the missing-table case means "unversioned"; anything else
+        # (e.g. the database being down) is re-raised by the inspection
+        with engine.connect() as conn:
+            if inspect(conn).has_table(VERSION_TABLE):
+                raise
+        return None
+
+
+def stamp_schema_version(conn, version: str = SCHEMA_VERSION):
+    """Record the schema revision the way `alembic stamp` does"""
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} "
+        f"(version_num VARCHAR(32) NOT NULL PRIMARY KEY)"
+    ))
+    conn.execute(text(f"DELETE FROM {VERSION_TABLE}"))
+    conn.execute(text(f"INSERT INTO {VERSION_TABLE} (version_num) VALUES (:version)"),
+                 {"version": version})
+
+
+def ensure_schema(engine) -> str:
+    """Check the schema revision with a single query.
+
+    An unversioned database is created from the models when
+    AUTO_CREATE_SCHEMA is enabled (local development) or the database is
+    SQLite (embedded mode); otherwise run `alembic upgrade head` before
+    starting the API.
+    """
+    version = get_schema_version(engine)
+    if version == SCHEMA_VERSION:
+        return version
+
+    if version is None and (settings.AUTO_CREATE_SCHEMA or engine.dialect.name == "sqlite"):
+        import models  # noqa: F401 - registers every table on Base.metadata
+        from config.database import Base
+
+        with engine.begin() as conn:
+            Base.metadata.create_all(bind=conn)
+            stamp_schema_version(conn)
+        return SCHEMA_VERSION
+
+    raise SchemaVersionError(
+        f"Database schema is at {version or 'no version'}, expected {SCHEMA_VERSION}; "
+        f"run 'alembic upgrade head'"
+    )
@@ -0,0 +1,162 @@
+"""
+Database Metrics
+Per-request SQL statement counts and timings, and connection pool instrumentation
+"""
+
+from contextvars import ContextVar
+from typing import List, Optional
+import logging
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from config.settings import settings
+from middleware.tracing import current_trace
+
+logger = logging.getLogger("db_metrics")
+
+STATEMENTS_PER_REQUEST = Histogram(
+    "db_statements_per_request", "SQL statements executed per request",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL per request"
+)
+STATEMENT_BUDGET_EXCEEDED = Counter(
+    "db_statement_budget_exceeded_total", "Requests that exceeded DB_STATEMENT_BUDGET"
+)
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond DB_POOL_SIZE")
+POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connection checkouts")
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that hit DB_POOL_TIMEOUT")
+
+
+# Statements kept per request for the over-budget log line
+KEPT_STATEMENTS = 5
+
+
+class RequestDBStats:
+    """SQL activity of a single request"""
+
+    def __init__(self):
+        self.count = 0
+        self.statements: List[str] = []  # The first KEPT_STATEMENTS only
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        if len(self.statements) < KEPT_STATEMENTS:
+            self.statements.append(statement)
+        self.db_time += elapsed
+
+
+_current_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("db_stats", default=None)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            POOL_WAIT.observe(waited)
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.pool_wait += waited
+
+
+def instrument_engine(engine):
+    """Time every SQL statement once, feeding both the request's DB stats and
+    its 'db' trace span, and track pool checkouts and overflow"""
+
+    def _update_pool_gauges():
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            POOL_CHECKED_OUT.set(pool.checkedout())
+            POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        trace = current_trace()
+        if trace is not None:
+            trace.add("db", elapsed * 1000, statement=statement[:120])
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.inc()
+        _update_pool_gauges()
+
+    @event.listens_for(engine.pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        _update_pool_gauges()
+
+
+class DBMetricsMiddleware:
+    """Reports SQL statements per request and flags requests over budget"""
+
+    def __init__(self, app):
+        self.app = app
+        self.flag_over_budget = settings.ENVIRONMENT in ("development", "test")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDBStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start" and self.flag_over_budget:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-statements", str(stats.count).encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _current_stats.reset(token)
+            self._report(stats, scope)
+
+    def _report(self, stats: RequestDBStats, scope):
+        # Requests without SQL are observed too, as 0
+        STATEMENTS_PER_REQUEST.observe(stats.count)
+        DB_TIME_PER_REQUEST.observe(stats.db_time)
+
+        if stats.count > settings.DB_STATEMENT_BUDGET:
+            STATEMENT_BUDGET_EXCEEDED.inc()
+            if self.flag_over_budget:
+                logger.warning(
+                    "%s %s executed %d SQL statements (budget %d, %.1f ms in DB, "
+                    "%.1f ms waiting for pool); first statements: %s",
+                    scope["method"], scope["path"], stats.count, settings.DB_STATEMENT_BUDGET,
+                    stats.db_time * 1000, stats.pool_wait * 1000,
+                    [statement[:120] for statement in stats.statements]
+                )
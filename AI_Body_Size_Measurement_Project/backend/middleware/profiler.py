@@ -0,0 +1,44 @@
+"""
+Sampling Profiler
+The backend's on-demand profiler session and the middleware that marks
+request boundaries for it
+
+The profiler samples every thread's Python stack, either for N seconds or
+while the next K requests run; see shared/sampling_profiler.py.
+"""
+
+from pathlib import Path
+import sys
+
+from config.settings import settings
+
+# shared/ sits next to backend/ (and is mounted at /shared in containers)
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from sampling_profiler import SamplingProfiler  # noqa: E402
+
+profiler = SamplingProfiler(
+    interval=settings.PROFILER_INTERVAL_MS / 1000,
+    max_seconds=settings.PROFILER_MAX_SECONDS
+)
+
+
+# Requests to the profiler itself are not counted
+PROFILER_PATH = "/api/admin/profiler"
+
+
+class ProfilerMiddleware:
+    """Marks request boundaries for request-count profiling sessions"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.active or scope["path"] == PROFILER_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        profiled = profiler.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.request_finished(profiled)
@@ -0,0 +1,216 @@
+"""
+Admission Control
+Token-bucket rate limits and an in-flight cap that protect the AI server
+"""
+
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+import asyncio
+import json
+import logging
+import math
+import time
+
+from prometheus_client import Counter
+
+from config.settings import settings
+from services.auth_service import AuthError, decode_token
+
+logger = logging.getLogger("rate_limit")
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests rejected by admission control", ["reason"]
+)
+
+# Paths (method, path) that go through admission control
+LIMITED_ROUTES = {("POST", "/api/measurements/capture")}
+
+
+# A bucket to take from: (key, capacity, refill rate in tokens per second)
+Bucket = Tuple[str, int, float]
+
+
+class InMemoryTokenBucketStore:
+    """Token buckets held in this process"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, buckets: Sequence[Bucket], cost: int = 1) -> Tuple[Optional[int], float]:
+        """Take cost tokens from every bucket, or from none of them.
+
+        Returns (index of the first bucket short of tokens or None, seconds
+        until all of them have enough).
+        """
+        now = time.monotonic()
+        refilled = []
+        for key, capacity, rate in buckets:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            refilled.append(min(capacity, tokens + (now - updated) * rate))
+
+        short = [i for i, tokens in enumerate(refilled) if tokens < cost]
+        if short:
+            return short[0], max((cost - refilled[i]) / buckets[i][2] for i in short)
+
+        for (key, _, _), tokens in zip(buckets, refilled):
+            self._buckets.pop(key, None)
+            self._buckets[key] = (tokens - cost, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return None, 0.0
+
+    async def close(self):
+        pass
+
+
+# Refill and take atomically on the Redis server, using its clock so all
+# replicas agree on elapsed time. KEYS are the buckets; ARGV is the cost
+# followed by each bucket's capacity and rate. Nothing is deducted unless
+# every bucket has enough tokens.
+_TAKE_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = {}
+local rejected = -1
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens[i] = math.min(capacity, available + math.max(0, now - ts) * rate)
+    if tokens[i] < cost then
+        if rejected < 0 then
+            rejected = i - 1
+        end
+        retry_after = math.max(retry_after, (cost - tokens[i]) / rate)
+    end
+end
+if rejected >= 0 then
+    return {rejected, tostring(retry_after)}
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    redis.call('HSET', key, 'tokens', tostring(tokens[i] - cost), 'ts', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return {-1, '0'}
+"""
+
+
+class RedisTokenBucketStore:
+    """Token buckets shared by all replicas through Redis.
+
+    Any asyncio Redis client with eval() works, e.g.
+    fakeredis.aioredis.FakeRedis() in tests.
+    """
+
+    def __init__(self, client=None, prefix: str = "ratelimit:"):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(settings.REDIS_URL)
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, buckets: Sequence[Bucket], cost: int = 1) -> Tuple[Optional[int], float]:
+        args = [cost]
+        for _, capacity, rate in buckets:
+            args += [capacity, rate]
+        rejected, retry_after = await self.client.eval(
+            _TAKE_SCRIPT, len(buckets), *(self.prefix + key for key, _, _ in buckets), *args
+        )
+        rejected = int(rejected)
+        return (rejected if rejected >= 0 else None), float(retry_after)
+
+    async def close(self):
+        close = getattr(self.client, "aclose", None) or self.client.close
+        await close()
+
+
+def create_token_bucket_store():
+    """Store selected by RATE_LIMIT_BACKEND"""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBucketStore()
+    return InMemoryTokenBucketStore()
+
+
+class AdmissionControlMiddleware:
+    """Per-user and global token buckets plus a cap on in-flight AI calls.
+
+    Over-budget requests get 429 with Retry-After instead of queueing in
+    front of the AI server.
+    """
+
+    def __init__(self, app, store=None):
+        self.app = app
+        self.store = store or create_token_bucket_store()
+        self.in_flight = asyncio.Semaphore(settings.MAX_INFLIGHT_AI_CALLS)
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED
+                or (scope["method"], scope["path"]) not in LIMITED_ROUTES):
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await self._check_buckets(scope)
+        if rejection is not None:
+            await self._reject(send, *rejection)
+            return
+
+        if self.in_flight.locked():
+            await self._reject(send, "in_flight", 1.0)
+            return
+
+        async with self.in_flight:
+            await self.app(scope, receive, send)
+
+    async def _check_buckets(self, scope) -> Optional[Tuple[str, float]]:
+        reasons = ("user", "global")
+        buckets = (
+            (f"capture:user:{self._client_key(scope)}",
+             settings.CAPTURE_BURST_PER_USER, settings.CAPTURE_RATE_PER_USER),
+            ("capture:global", settings.CAPTURE_BURST_GLOBAL, settings.CAPTURE_RATE_GLOBAL),
+        )
+        try:
+            # All or nothing: a request the global bucket turns away must
+            # not also spend the caller's own budget
+            rejected, retry_after = await self.store.take(buckets)
+        except Exception as e:
+            # Fail open: a store outage must not take captures down with it
+            logger.warning("Rate limit store unavailable: %s", e)
+            return None
+        if rejected is not None:
+            return reasons[rejected], retry_after
+        return None
+
+    @staticmethod
+    def _client_key(scope) -> str:
+        """Identify the caller: the bearer token's user, else the client address"""
+        for name, value in scope.get("headers", []):
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                try:
+                    # Signature-checked only; the route still authenticates fully
+                    return str(decode_token(value[7:].decode("latin-1")))
+                except AuthError:
+                    break
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    async def _reject(send, reason: str, retry_after: float):
+        ADMISSION_REJECTED.labels(reason=reason).inc()
+        body = json.dumps({"detail": "Too many measurement requests, please retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
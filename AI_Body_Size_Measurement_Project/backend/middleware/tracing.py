@@ -0,0 +1,131 @@
+"""
+Request Tracing
+Request ids, span timings and slow-request sampling, logged as JSON
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+import logging
+import random
+import re
+import time
+import uuid
+
+from pythonjsonlogger import jsonlogger
+
+from config.settings import settings
+
+# Spans kept per request; stage totals keep counting past this
+MAX_SPANS = 200
+
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+
+logger = logging.getLogger("tracing")
+
+
+def configure_logging():
+    """Send trace records to stdout as JSON"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(jsonlogger.JsonFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class Trace:
+    """Timings collected for a single request"""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.start = time.perf_counter()
+        self.spans: List[Dict] = []
+        self.stages: Dict[str, float] = {}
+
+    def add(self, name: str, duration_ms: float, **attrs):
+        """Record a span and add its duration to the stage total"""
+        self.stages[name] = self.stages.get(name, 0.0) + duration_ms
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append({
+                "name": name,
+                "start_ms": round((time.perf_counter() - self.start) * 1000 - duration_ms, 2),
+                "duration_ms": round(duration_ms, 2),
+                **attrs
+            })
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the request being handled, if any"""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a block of work as a span of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(name, (time.perf_counter() - start) * 1000, **attrs)
+
+
+class TracingMiddleware:
+    """Assigns a request id, collects spans and logs slow or sampled requests"""
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.REQUEST_ID_HEADER.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = dict(scope["headers"]).get(self.header, b"").decode("latin-1")
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        trace = Trace(request_id)
+        token = _current_trace.set(trace)
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (self.header, request_id.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _current_trace.reset(token)
+            self._log(trace, scope, status_code)
+
+    def _log(self, trace: Trace, scope, status_code: int):
+        duration_ms = trace.elapsed_ms()
+        slow = duration_ms >= settings.TRACE_SLOW_REQUEST_MS
+        if not slow and random.random() >= settings.TRACE_SAMPLE_RATE:
+            return
+
+        logger.log(logging.WARNING if slow else logging.INFO, "request", extra={
+            "request_id": trace.request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "slow": slow,
+            "stages": {name: round(ms, 2) for name, ms in trace.stages.items()},
+            "spans": trace.spans
+        })
@@ -0,0 +1,34 @@
+"""
+Alembic Environment
+Runs migrations against Settings.DATABASE_URL using the models' metadata
+"""
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from config.settings import settings
+from config.database import Base
+import models  # noqa: F401 - registers every table on Base.metadata
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(url=settings.DATABASE_URL, target_metadata=target_metadata,
+                      literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,21 @@
+"""Baseline: the schema created by database/schema.sql
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases are initialised from database/schema.sql, which stamps
+    # this revision; later revisions migrate from here
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,75 @@
+"""Add profile_body_models
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Dimensions and weighting as in services/body_model_service.py at this
+# revision: each completed measurement counts by overall_confidence / 100,
+# or fully when no confidence was recorded
+DIMENSIONS = [
+    'height', 'chest', 'bust', 'under_bust', 'waist', 'hip',
+    'shoulder_width', 'arm_length', 'inseam', 'outseam'
+]
+
+BACKFILL = f"""
+    INSERT INTO profile_body_models
+        (profile_id, latest_measurement_id, general_size, measurement_count, estimates, weighted_sums)
+    SELECT sums.profile_id, latest.id, latest.general_size, sums.measurement_count,
+           jsonb_strip_nulls(jsonb_build_object({', '.join(
+               f"'{d}', CASE WHEN {d}_weight > 1e-9 THEN ROUND({d}_sum / {d}_weight, 2) END"
+               for d in DIMENSIONS)})),
+           jsonb_strip_nulls(jsonb_build_object({', '.join(
+               f"'{d}', CASE WHEN {d}_weight IS NOT NULL THEN jsonb_build_array({d}_sum, {d}_weight) END"
+               for d in DIMENSIONS)}))
+    FROM (
+        SELECT profile_id, COUNT(*) AS measurement_count,
+               {', '.join(f"SUM(weight * {d}) AS {d}_sum, "
+                          f"SUM(CASE WHEN {d} IS NOT NULL THEN weight END) AS {d}_weight"
+                          for d in DIMENSIONS)}
+        FROM (
+            SELECT m.*, COALESCE(m.overall_confidence / 100, 1) AS weight
+            FROM measurements m
+            WHERE m.profile_id IS NOT NULL AND m.status = 'completed'
+        ) weighted
+        GROUP BY profile_id
+    ) sums
+    JOIN (
+        SELECT DISTINCT ON (m.profile_id) m.profile_id, m.id, s.general_size
+        FROM measurements m
+        LEFT JOIN size_recommendations s ON s.measurement_id = m.id AND s.brand_id IS NULL
+        WHERE m.profile_id IS NOT NULL AND m.status = 'completed'
+        ORDER BY m.profile_id, m.measurement_date DESC NULLS LAST, s.created_at
+    ) latest ON latest.profile_id = sums.profile_id
+"""
+
+
+def upgrade():
+    op.create_table(
+        'profile_body_models',
+        sa.Column('profile_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('measurement_profiles.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('latest_measurement_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('measurements.id', ondelete='SET NULL')),
+        sa.Column('general_size', sa.String(10)),
+        sa.Column('measurement_count', sa.Integer, server_default='0'),
+        sa.Column('estimates', postgresql.JSONB, server_default='{}'),
+        sa.Column('weighted_sums', postgresql.JSONB, server_default='{}'),
+        sa.Column('updated_at', sa.DateTime, server_default=sa.func.now()),
+    )
+    # Build every measured profile's body model from its existing history
+    op.execute(BACKFILL)
+
+
+def downgrade():
+    op.drop_table('profile_body_models')
@@ -0,0 +1,23 @@
+"""Store pose landmarks on measurements
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Packed float32[33][4] landmarks, re-measured by ai_model/recompute_measurements.py
+    op.add_column('measurements', sa.Column('landmarks', sa.LargeBinary))
+
+
+def downgrade():
+    op.drop_column('measurements', 'landmarks')
@@ -1,5 +1,7 @@
 # Models package initialization
 from .user import User
-from .measurement import Measurement, MeasurementProfile, SizeRecommendation
+from .measurement import Measurement, MeasurementProfile, SizeRecommendation, ProfileBodyModel
+from .size_chart import SizeChart
+from .audit_log import AuditLog
 
-__all__ = ['User', 'Measurement', 'MeasurementProfile', 'SizeRecommendation']
+__all__ = ['User', 'Measurement', 'MeasurementProfile', 'SizeRecommendation', 'ProfileBodyModel', 'SizeChart', 'AuditLog']
@@ -0,0 +1,29 @@
+"""
+Audit Log Model
+SQLAlchemy model for audit_logs table
+"""
+
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from models.types import UUID, JSONB, INET
+from datetime import datetime
+import uuid
+
+from config.database import Base
+
+class AuditLog(Base):
+    """Audit trail entry for a system action"""
+    __tablename__ = "audit_logs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='SET NULL'))
+    action = Column(String(100), nullable=False)
+    entity_type = Column(String(50))  # 'user', 'measurement', 'size_chart', etc.
+    entity_id = Column(UUID(as_uuid=True))
+    old_values = Column(JSONB)
+    new_values = Column(JSONB)
+    ip_address = Column(INET)
+    user_agent = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AuditLog {self.action} {self.entity_type}>"
@@ -3,8 +3,8 @@ Measurement Model
 SQLAlchemy model for measurements table with gender-specific fields
 """
 
-from sqlalchemy import Column, String, DateTime, Integer, Numeric, Boolean, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Integer, Numeric, Boolean, Text, ForeignKey, LargeBinary
+from models.types import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -52,6 +52,7 @@ class Measurement(Base):
     processing_time_ms = Column(Integer)
     ai_model_version = Column(String(50))
     reference_object = Column(String(50))  # 'credit_card', 'a4_sheet', etc.
+    landmarks = Column(LargeBinary)  # Packed float32[33][4] pose landmarks from ai_model_version
     
     # Status
     status = Column(String(20), default='completed')  # 'processing', 'completed', 'flagged', 'rejected'
@@ -94,7 +95,7 @@ class MeasurementProfile(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     profile_name = Column(String(100), nullable=False)
     gender = Column(String(10), nullable=False)
-    relationship_type = Column(String(50))  # 'self', 'spouse', 'child', etc.
+    relationship_type = Column('relationship', String(50))  # 'self', 'spouse', 'child', etc.
     is_default = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -138,3 +139,23 @@ class SizeRecommendation(Base):
     
     def __repr__(self):
         return f"<SizeRecommendation {self.general_size}>"
+
+
+class ProfileBodyModel(Base):
+    """Incrementally maintained body estimate for a measurement profile"""
+    __tablename__ = "profile_body_models"
+    
+    profile_id = Column(UUID(as_uuid=True), ForeignKey('measurement_profiles.id', ondelete='CASCADE'), primary_key=True)
+    latest_measurement_id = Column(UUID(as_uuid=True), ForeignKey('measurements.id', ondelete='SET NULL'))
+    general_size = Column(String(10))  # Size of the latest measurement
+    measurement_count = Column(Integer, default=0)
+    
+    # Visibility-weighted estimate per dimension, e.g. {"chest": 98.4}
+    estimates = Column(JSONB, default=dict)
+    # Running {dimension: [sum(weight * value), sum(weight)]} behind the estimates
+    weighted_sums = Column(JSONB, default=dict)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ProfileBodyModel {self.profile_id} - {self.general_size}>"
@@ -0,0 +1,34 @@
+"""
+Size Chart Model
+SQLAlchemy model for size_charts table
+"""
+
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey
+from datetime import datetime
+import uuid
+
+from config.database import Base
+from models.types import UUID, JSONB
+
+class SizeChart(Base):
+    """Brand-specific size chart"""
+    __tablename__ = "size_charts"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    brand_name = Column(String(100), nullable=False)
+    gender = Column(String(10), nullable=False)  # 'male', 'female' or 'unisex'
+    category = Column(String(50))  # 'shirts', 'pants', 'dresses', etc.
+    
+    # Size mappings, e.g. {"S": {"chest": [86, 91], "waist": [71, 76]}, "M": {...}}
+    size_data = Column(JSONB, nullable=False)
+    
+    region = Column(String(10), default='US')  # 'US', 'UK', 'EU', 'Asia'
+    is_active = Column(Boolean, default=True)
+    version = Column(Integer, default=1)
+    
+    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SizeChart {self.brand_name} {self.gender}>"
@@ -0,0 +1,16 @@
+"""
+Portable Column Types
+PostgreSQL types with fallbacks, so the models also run on SQLite
+"""
+
+from sqlalchemy import JSON, String, Uuid
+from sqlalchemy.dialects.postgresql import INET as PG_INET, JSONB as PG_JSONB
+
+# Native uuid on PostgreSQL, CHAR(32) elsewhere; accepts as_uuid=True like the dialect type
+UUID = Uuid
+
+# JSONB on PostgreSQL, JSON (text) elsewhere
+JSONB = JSON().with_variant(PG_JSONB(), "postgresql")
+
+# inet on PostgreSQL, a string long enough for IPv6 elsewhere
+INET = String(45).with_variant(PG_INET(), "postgresql")
@@ -4,7 +4,7 @@ SQLAlchemy model for users table
 """
 
 from sqlalchemy import Column, String, Boolean, DateTime, Date
-from sqlalchemy.dialects.postgresql import UUID
+from models.types import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -3,15 +3,22 @@ Admin Routes
 API endpoints for admin operations
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
-from typing import List
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 from config.database import get_db
 from models.user import User
 from models.measurement import Measurement
+from services.body_model_service import apply_measurement, remove_measurement
+from services.audit_service import audit
+from services.auth_service import Principal, get_current_admin
+from middleware.profiler import profiler
+from config.settings import settings
 
 router = APIRouter()
 
@@ -22,11 +29,20 @@ class AdminStats(BaseModel):
     avg_confidence: float
     flagged_measurements: int
 
+class MeasurementReview(BaseModel):
+    status: str  # 'completed' (approve) or 'rejected'
+    admin_notes: Optional[str] = None
+
+class ProfilerSession(BaseModel):
+    seconds: Optional[float] = Field(None, gt=0)  # Sample for N seconds...
+    requests: Optional[int] = Field(None, gt=0)  # ...or for the next K requests
+
 @router.get("/stats", response_model=AdminStats)
-async def get_admin_stats(db: Session = Depends(get_db)):
+async def get_admin_stats(
+    admin: Principal = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
     """Get system statistics"""
-    # TODO: Check admin authorization
-    
     total_users = db.query(User).count()
     total_measurements = db.query(Measurement).count()
     
@@ -41,26 +57,112 @@ async def get_admin_stats(db: Session = Depends(get_db)):
 async def get_all_users(
     skip: int = 0,
     limit: int = 100,
+    admin: Principal = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """Get all users (admin only)"""
-    # TODO: Check admin authorization
     users = db.query(User).offset(skip).limit(limit).all()
     return users
 
 @router.get("/measurements/flagged")
-async def get_flagged_measurements(db: Session = Depends(get_db)):
+async def get_flagged_measurements(
+    admin: Principal = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
     """Get flagged measurements for review"""
-    # TODO: Check admin authorization
     flagged = db.query(Measurement).filter(Measurement.status == 'flagged').all()
     return flagged
 
 @router.put("/measurements/{measurement_id}/review")
 async def review_measurement(
+    request: Request,
     measurement_id: str,
+    review: MeasurementReview,
+    admin: Principal = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """Review and approve/reject measurement"""
-    # TODO: Check admin authorization
-    # TODO: Update measurement status
-    return {"message": "Measurement reviewed"}
+    if review.status not in ('completed', 'rejected'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Status must be 'completed' or 'rejected'"
+        )
+    
+    measurement = db.query(Measurement).filter(Measurement.id == measurement_id).first()
+    if not measurement:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Measurement not found"
+        )
+    
+    old_values = {"status": measurement.status, "admin_notes": measurement.admin_notes}
+    
+    # Keep the profile's body model in step with the status change
+    remove_measurement(db, measurement)
+    measurement.status = review.status
+    measurement.admin_reviewed = True
+    measurement.admin_notes = review.admin_notes
+    apply_measurement(db, measurement)
+    db.commit()
+    
+    audit(request, "measurement.review", "measurement", measurement.id, user_id=admin.id,
+          old_values=old_values,
+          new_values={"status": measurement.status, "admin_notes": measurement.admin_notes})
+    
+    return {"message": "Measurement reviewed", "status": measurement.status}
+
+def require_profiler():
+    """The profiler endpoints only exist when PROFILER_ENABLED is set"""
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+
+@router.post("/profiler", status_code=status.HTTP_202_ACCEPTED,
+             dependencies=[Depends(require_profiler)])
+async def start_profiler(
+    session: ProfilerSession,
+    admin: Principal = Depends(get_current_admin)
+):
+    """Start a sampling profiler session"""
+    if (session.seconds is None) == (session.requests is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give exactly one of 'seconds' or 'requests'"
+        )
+    
+    try:
+        if session.seconds is not None:
+            profiler.start_timed(session.seconds)
+        else:
+            profiler.start_requests(session.requests)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    return profiler.status()
+
+@router.delete("/profiler", dependencies=[Depends(require_profiler)])
+async def cancel_profiler(admin: Principal = Depends(get_current_admin)):
+    """End the running profiler session early, keeping what it sampled"""
+    if not await run_in_threadpool(profiler.cancel):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="No profiling session is running"
+        )
+    return profiler.status()
+
+@router.get("/profiler", dependencies=[Depends(require_profiler)])
+async def get_profiler_results(
+    format: str = Query("top", pattern="^(top|collapsed)$"),
+    limit: int = Query(50, ge=1, le=1000),
+    admin: Principal = Depends(get_current_admin)
+):
+    """Get the last session's results as a top-functions table or collapsed stacks"""
+    result = profiler.status()
+    if result["state"] != "finished":
+        return result
+    
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    return {**result, "functions": profiler.top(limit)}
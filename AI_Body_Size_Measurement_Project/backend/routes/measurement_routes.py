@@ -3,75 +3,248 @@ Measurement Routes
 API endpoints for body measurements
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+from uuid import UUID
 import base64
 
 from config.database import get_db
-from models.measurement import Measurement
+from config.settings import settings
+from models.measurement import Measurement, MeasurementProfile, SizeRecommendation
+from services.ai_service import get_ai_client, limit_stream, AIServiceError, UploadTooLargeError
+from services.idempotency_service import (
+    IdempotencyConflict, IdempotencyInProgress, fingerprint, get_idempotency_store, run_once
+)
+from services.measurement_service import query_measurement_history
+from services.body_model_service import apply_measurement, remove_measurement
+from services.audit_service import audit
+from services.auth_service import Principal, get_current_principal
+from middleware.tracing import current_trace
 
 router = APIRouter()
 
-# Pydantic schemas
-class MeasurementCreate(BaseModel):
-    gender: str
-    image_data: str  # Base64 encoded image
-    reference_scale: float = 1.0
+# Measurement columns filled from the AI server's response
+AI_MEASUREMENT_FIELDS = [
+    'height', 'chest', 'bust', 'under_bust', 'waist', 'hip',
+    'shoulder_width', 'arm_length', 'inseam', 'outseam'
+]
 
+# Pydantic schemas
 class MeasurementResponse(BaseModel):
-    id: str
+    id: UUID
     gender: str
-    height: float = None
-    chest: float = None
-    bust: float = None
-    waist: float = None
-    hip: float = None
-    shoulder_width: float = None
-    overall_confidence: float = None
+    height: Optional[float] = None
+    chest: Optional[float] = None
+    bust: Optional[float] = None
+    waist: Optional[float] = None
+    hip: Optional[float] = None
+    shoulder_width: Optional[float] = None
+    overall_confidence: Optional[float] = None
     measurement_date: datetime
     status: str
     
     class Config:
         from_attributes = True
 
+class SizeRecommendationResponse(BaseModel):
+    general_size: Optional[str] = None
+    numeric_size: Optional[str] = None
+    us_size: Optional[str] = None
+    uk_size: Optional[str] = None
+    eu_size: Optional[str] = None
+    asia_size: Optional[str] = None
+    fit_preference: Optional[str] = None
+    recommendation_confidence: Optional[float] = None
+    
+    class Config:
+        from_attributes = True
+
+class ProfileSummary(BaseModel):
+    id: UUID
+    profile_name: str
+    
+    class Config:
+        from_attributes = True
+
+class MeasurementHistoryItem(MeasurementResponse):
+    profile: Optional[ProfileSummary] = None
+    size_recommendations: List[SizeRecommendationResponse] = []
+
 @router.post("/capture", response_model=MeasurementResponse, status_code=status.HTTP_201_CREATED)
 async def capture_measurement(
-    measurement_data: MeasurementCreate,
+    request: Request,
+    gender: str,
+    profile_id: Optional[UUID] = None,
+    reference_height: float = 170.0,
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    """Capture and process body measurement"""
-    # TODO: Call AI service to process image
-    # TODO: Save measurement to database
-    # TODO: Generate size recommendation
-    
-    return {
-        "message": "Measurement captured",
-        "status": "processing"
-    }
+    """Capture and process body measurement
+    
+    The image is sent as the raw request body (e.g. image/jpeg) and is
+    streamed to the AI server chunk by chunk instead of being buffered.
+    Retries that repeat the Idempotency-Key header replay the first
+    response instead of measuring again.
+    """
+    if gender not in ('male', 'female'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid gender"
+        )
+    
+    # Captures may only be filed under the caller's own profiles
+    if profile_id is not None:
+        profile = db.get(MeasurementProfile, profile_id)
+        if not profile or profile.user_id != principal.id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Profile not found"
+            )
+    
+    async def capture(chunks) -> dict:
+        content_length = request.headers.get("content-length")
+        try:
+            result = await get_ai_client().measure_stream(
+                chunks,
+                gender=gender,
+                reference_scale=reference_height,
+                content_length=int(content_length) if content_length else None,
+                content_type=request.headers.get("content-type", "application/octet-stream")
+            )
+        except UploadTooLargeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        except AIServiceError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        
+        values = result['measurements']
+        trace = current_trace()
+        measurement = Measurement(
+            user_id=principal.id,
+            profile_id=profile_id,
+            gender=gender,
+            overall_confidence=round(result['confidence'] * 100, 2),
+            processing_time_ms=int(trace.elapsed_ms()) if trace else None,
+            ai_model_version=result.get('model_version'),
+            landmarks=base64.b64decode(result['landmarks']) if result.get('landmarks') else None,
+            **{field: values[field] for field in AI_MEASUREMENT_FIELDS if field in values}
+        )
+        measurement.size_recommendations.append(
+            SizeRecommendation(
+                general_size=result['size_recommendation'],
+                recommendation_confidence=round(result['confidence'] * 100, 2)
+            )
+        )
+        
+        db.add(measurement)
+        db.flush()
+        apply_measurement(db, measurement)
+        db.commit()
+        db.refresh(measurement)
+        
+        audit(request, "measurement.capture", "measurement", measurement.id, user_id=measurement.user_id,
+              new_values={"profile_id": profile_id, "general_size": result['size_recommendation']})
+        
+        return jsonable_encoder(MeasurementResponse.model_validate(measurement))
+    
+    idempotency_key = request.headers.get("idempotency-key")
+    if not idempotency_key:
+        return await capture(request.stream())
+    
+    if len(idempotency_key) > 255:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key must be at most 255 characters"
+        )
+    
+    try:
+        body, replayed = await run_once(
+            get_idempotency_store(),
+            f"capture:{principal.id}:{idempotency_key}",
+            fingerprint(gender, profile_id, reference_height),
+            limit_stream(request.stream(), settings.MAX_UPLOAD_SIZE),
+            capture
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except IdempotencyInProgress as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content=body,
+        headers={"Idempotent-Replayed": "true" if replayed else "false"}
+    )
 
 @router.get("/", response_model=List[MeasurementResponse])
 async def get_user_measurements(
-    skip: int = 0,
-    limit: int = 10,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get user's measurement history"""
-    # TODO: Get user from JWT token
-    # measurements = db.query(Measurement).offset(skip).limit(limit).all()
-    return []
+    return (
+        db.query(Measurement)
+        .filter(Measurement.user_id == principal.id)
+        .order_by(Measurement.measurement_date.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+@router.get("/history", response_model=List[MeasurementHistoryItem])
+async def get_measurement_history(
+    profile_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = Query(None, description="Inclusive lower bound"),
+    date_to: Optional[datetime] = Query(
+        None, description="Exclusive upper bound; use the next day's midnight to include a whole day"
+    ),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=1000),
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Get measurement history with profiles and size recommendations
+    
+    Loads a page in a constant number of queries regardless of its size.
+    """
+    return query_measurement_history(
+        db, principal.id,
+        profile_id=profile_id,
+        date_from=date_from,
+        date_to=date_to,
+        skip=skip,
+        limit=limit
+    )
 
 @router.get("/{measurement_id}", response_model=MeasurementResponse)
 async def get_measurement(
-    measurement_id: str,
+    measurement_id: UUID,
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get specific measurement by ID"""
     measurement = db.query(Measurement).filter(Measurement.id == measurement_id).first()
     
-    if not measurement:
+    # Other users' measurements are reported as missing
+    if not measurement or not (measurement.user_id == principal.id or principal.is_admin):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Measurement not found"
@@ -81,19 +254,25 @@ async def get_measurement(
 
 @router.delete("/{measurement_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_measurement(
-    measurement_id: str,
+    request: Request,
+    measurement_id: UUID,
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete a measurement"""
     measurement = db.query(Measurement).filter(Measurement.id == measurement_id).first()
     
-    if not measurement:
+    if not measurement or not (measurement.user_id == principal.id or principal.is_admin):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Measurement not found"
         )
     
+    remove_measurement(db, measurement)
     db.delete(measurement)
     db.commit()
     
+    audit(request, "measurement.delete", "measurement", measurement.id, user_id=principal.id,
+          old_values={"gender": measurement.gender, "status": measurement.status})
+    
     return None
@@ -0,0 +1,76 @@
+"""
+Profile Routes
+API endpoints for measurement profiles
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+from pydantic import BaseModel
+from datetime import datetime
+from uuid import UUID
+
+from config.database import get_db
+from models.measurement import MeasurementProfile, ProfileBodyModel
+from services.auth_service import Principal, get_current_principal
+from services.body_model_service import rebuild_body_model
+
+router = APIRouter()
+
+# Pydantic schemas
+class CurrentSizeResponse(BaseModel):
+    profile_id: UUID
+    general_size: Optional[str] = None
+    latest_measurement_id: Optional[UUID] = None
+    measurement_count: int
+    estimates: Dict[str, float]
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+def get_owned_profile(db: Session, profile_id: UUID, principal: Principal) -> MeasurementProfile:
+    """The profile, if the caller owns it (or is an admin); 404 otherwise"""
+    profile = db.get(MeasurementProfile, profile_id)
+    if not profile or not (profile.user_id == principal.id or principal.is_admin):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return profile
+
+@router.get("/{profile_id}/current-size", response_model=CurrentSizeResponse)
+async def get_current_size(
+    profile_id: UUID,
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Get a profile's current size and body estimate (single-row lookup)"""
+    query = (
+        db.query(ProfileBodyModel)
+        .join(MeasurementProfile, MeasurementProfile.id == ProfileBodyModel.profile_id)
+        .filter(ProfileBodyModel.profile_id == profile_id)
+    )
+    if not principal.is_admin:
+        query = query.filter(MeasurementProfile.user_id == principal.id)
+    body_model = query.first()
+    if body_model is not None:
+        return body_model
+
+    # No row yet: the profile has no completed measurements, or was measured
+    # before body models existed (see POST .../current-size/rebuild)
+    get_owned_profile(db, profile_id, principal)
+    return CurrentSizeResponse(profile_id=profile_id, measurement_count=0, estimates={})
+
+@router.post("/{profile_id}/current-size/rebuild", response_model=CurrentSizeResponse)
+async def rebuild_current_size(
+    profile_id: UUID,
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Recompute a profile's body model from its full measurement history"""
+    get_owned_profile(db, profile_id, principal)
+    body_model = rebuild_body_model(db, profile_id)
+    db.commit()
+    db.refresh(body_model)
+    return body_model
@@ -3,14 +3,21 @@ User Routes
 API endpoints for user management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from typing import List
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
+from uuid import UUID
 
 from config.database import get_db
 from models.user import User
+from services.audit_service import audit
+from services.password_service import hash_password, verify_dummy_password, verify_password
+from services.auth_service import (
+    AuthError, Principal, REFRESH_TOKEN, create_access_token, create_refresh_token,
+    decode_token, get_current_principal
+)
 
 router = APIRouter()
 
@@ -23,7 +30,7 @@ class UserCreate(BaseModel):
     gender: str  # 'male' or 'female'
     
 class UserResponse(BaseModel):
-    id: str
+    id: UUID
     email: str
     first_name: str
     last_name: str
@@ -38,8 +45,18 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+def issue_tokens(user_id) -> dict:
+    return {
+        "access_token": create_access_token(user_id),
+        "refresh_token": create_refresh_token(user_id),
+        "token_type": "bearer"
+    }
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(request: Request, user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     # Check if user exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
@@ -49,10 +66,10 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
-    # Create new user (password hashing should be added)
+    # Create new user
     new_user = User(
         email=user_data.email,
-        password_hash=user_data.password,  # TODO: Hash password
+        password_hash=await hash_password(user_data.password),
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         gender=user_data.gender
@@ -62,6 +79,9 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(new_user)
     
+    audit(request, "user.register", "user", new_user.id, user_id=new_user.id,
+          new_values={"email": new_user.email, "gender": new_user.gender})
+    
     return new_user
 
 @router.post("/login")
@@ -70,25 +90,69 @@ async def login_user(credentials: UserLogin, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == credentials.email).first()
     
     if not user:
+        await verify_dummy_password(credentials.password)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
     
-    # TODO: Verify password hash
-    # TODO: Generate JWT token
+    valid, new_hash = await verify_password(credentials.password, user.password_hash)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials"
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is deactivated"
+        )
+    
+    # Upgrade hashes made with a different BCRYPT_ROUNDS
+    if new_hash:
+        user.password_hash = new_hash
+    user.last_login = datetime.utcnow()
+    db.commit()
     
     return {
-        "access_token": "dummy_token",
-        "token_type": "bearer",
-        "user": UserResponse.from_orm(user)
+        **issue_tokens(user.id),
+        "user": UserResponse.model_validate(user)
     }
 
+@router.post("/refresh")
+async def refresh_tokens(body: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access/refresh token pair"""
+    try:
+        user_id = decode_token(body.refresh_token, REFRESH_TOKEN)
+    except AuthError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
+    
+    # Refreshes are rare, so check the account itself rather than the cache
+    user = db.get(User, user_id)
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials"
+        )
+    
+    return issue_tokens(user.id)
+
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(db: Session = Depends(get_db)):
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
     """Get current user profile"""
-    # TODO: Get user from JWT token
-    return {"message": "Current user endpoint"}
+    user = db.get(User, principal.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
 
 @router.put("/me", response_model=UserResponse)
 async def update_user_profile(db: Session = Depends(get_db)):
@@ -0,0 +1,121 @@
+"""
+AI Service Client
+Streams captured images from the backend to the AI model server
+"""
+
+from typing import AsyncIterator, Dict, Optional, TYPE_CHECKING
+
+from config.settings import settings
+from middleware.tracing import current_trace, span
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_SIZE"""
+
+
+class AIServiceError(Exception):
+    """Raised when the AI server rejects or fails a measurement"""
+
+    def __init__(self, message: str, status_code: int = 502):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def limit_stream(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    """Pass chunks through, failing as soon as more than max_bytes have flowed"""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+        yield chunk
+
+
+class AIServiceClient:
+    """HTTP client for the AI model server"""
+
+    def __init__(self, base_url: str = None, timeout: float = None,
+                 transport: Optional["httpx.AsyncBaseTransport"] = None):
+        # Imported here to keep httpx off the API's import path
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            base_url=base_url or settings.AI_MODEL_URL,
+            timeout=timeout or settings.AI_MODEL_TIMEOUT,
+            transport=transport
+        )
+
+    async def measure_stream(self, chunks: AsyncIterator[bytes], gender: str,
+                             reference_scale: float,
+                             content_length: Optional[int] = None,
+                             content_type: str = "application/octet-stream") -> Dict:
+        """Forward raw image bytes to /api/measure as a streamed request body.
+
+        Chunks are sent as they arrive, so the backend never holds more than
+        one chunk of the image. MAX_UPLOAD_SIZE is enforced while streaming.
+        """
+        import httpx
+
+        if content_length is not None and content_length > settings.MAX_UPLOAD_SIZE:
+            raise UploadTooLargeError(f"Upload exceeds {settings.MAX_UPLOAD_SIZE} bytes")
+
+        headers = {"Content-Type": content_type}
+        if content_length is not None:
+            headers["Content-Length"] = str(content_length)
+        trace = current_trace()
+        if trace is not None:
+            headers[settings.REQUEST_ID_HEADER] = trace.request_id
+
+        try:
+            with span("ai_call"):
+                response = await self._client.post(
+                    "/api/measure",
+                    params={"gender": gender, "reference_height": reference_scale},
+                    content=limit_stream(chunks, settings.MAX_UPLOAD_SIZE),
+                    headers=headers
+                )
+        except httpx.TimeoutException:
+            raise AIServiceError("AI server timed out", status_code=504)
+        except httpx.TransportError as e:
+            raise AIServiceError(f"AI server unavailable: {e}", status_code=502)
+
+        try:
+            result = response.json()
+        except ValueError:
+            raise AIServiceError(f"Invalid response from AI server ({response.status_code})")
+
+        # Inference stage timings reported by the AI server
+        if trace is not None:
+            for stage, duration_ms in result.get("timings_ms", {}).items():
+                trace.add(f"ai.{stage}", duration_ms)
+
+        if response.status_code != 200 or not result.get("success"):
+            status_code = 422 if response.status_code == 400 else 502
+            raise AIServiceError(result.get("error", "Measurement failed"), status_code=status_code)
+
+        return result
+
+    async def close(self):
+        await self._client.aclose()
+
+
+_client: Optional[AIServiceClient] = None
+
+
+def get_ai_client() -> AIServiceClient:
+    """Get the shared AI service client (one connection pool per process)"""
+    global _client
+    if _client is None:
+        _client = AIServiceClient()
+    return _client
+
+
+async def close_ai_client():
+    """Close the shared AI service client"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,193 @@
+"""
+Audit Service
+Buffers audit events from request handlers and writes them in batches
+
+Handlers only enqueue (no I/O); a background task flushes by batch size or
+time with one multi-row INSERT. The queue is bounded: when it is full,
+events are dropped and counted rather than slowing requests down. A batch
+the database rejects is retried row by row, so one bad event only loses
+itself.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import asyncio
+import ipaddress
+import logging
+import uuid
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from prometheus_client import Counter, Gauge
+from sqlalchemy import insert
+
+from config.settings import settings
+
+logger = logging.getLogger("audit")
+
+AUDIT_ENQUEUED = Counter("audit_events_enqueued_total", "Audit events accepted")
+AUDIT_WRITTEN = Counter("audit_events_written_total", "Audit events written to audit_logs")
+AUDIT_DROPPED = Counter("audit_events_dropped_total", "Audit events dropped", ["reason"])
+AUDIT_QUEUE_DEPTH = Gauge("audit_queue_depth", "Audit events waiting to be written")
+
+
+def write_audit_batch(rows: List[Dict]):
+    """Insert a batch of audit rows with a single multi-row INSERT"""
+    from config.database import engine
+    from models.audit_log import AuditLog
+
+    with engine.begin() as conn:
+        conn.execute(insert(AuditLog.__table__), rows)
+
+
+def normalize_ip(address: Optional[str]) -> Optional[str]:
+    """The address as the inet column stores it, or None if it is not an IP"""
+    if not address:
+        return None
+    try:
+        return str(ipaddress.ip_address(address))
+    except ValueError:
+        return None
+
+
+class AuditWriter:
+    """Bounded queue of audit events with a batching background flusher"""
+
+    def __init__(self, write_batch: Callable[[List[Dict]], None] = write_audit_batch,
+                 max_queue: int = None, batch_size: int = None, flush_interval: float = None):
+        self.write_batch = write_batch
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.AUDIT_FLUSH_INTERVAL
+        self.max_queue = max_queue or settings.AUDIT_QUEUE_SIZE
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def record(self, action: str, entity_type: str = None, entity_id=None, user_id=None,
+               old_values: Dict = None, new_values: Dict = None,
+               ip_address: str = None, user_agent: str = None):
+        """Enqueue an audit event without blocking"""
+        if self._task is None or self._closing:
+            return
+
+        event = {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "old_values": old_values,
+            "new_values": new_values,
+            "ip_address": normalize_ip(ip_address),
+            "user_agent": user_agent,
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            AUDIT_DROPPED.labels(reason="queue_full").inc()
+            return
+        AUDIT_ENQUEUED.inc()
+
+    async def start(self):
+        if self._task is None:
+            self._closing = False
+            # A queue is bound to the event loop it is first used on
+            self.queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop accepting events and write everything still queued"""
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            # Wake the flusher if it is waiting on an empty queue
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+        await self._task
+        self._task = None
+
+    def _take_batch(self) -> List[Dict]:
+        batch = []
+        while len(batch) < self.batch_size and not self.queue.empty():
+            event = self.queue.get_nowait()
+            if event is not None:
+                batch.append(event)
+        return batch
+
+    async def _collect_batch(self) -> List[Dict]:
+        """Gather events until the batch is full or flush_interval has passed"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch = []
+        while len(batch) < self.batch_size and not self._closing:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if event is not None:
+                batch.append(event)
+        return batch
+
+    async def _run(self):
+        while True:
+            if self._closing:
+                batch = self._take_batch()
+                if not batch:
+                    return
+            else:
+                batch = await self._collect_batch()
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict]):
+        AUDIT_QUEUE_DEPTH.set(self.queue.qsize())
+        if not batch:
+            return
+        rows = [
+            {**event,
+             "old_values": jsonable_encoder(event["old_values"]),
+             "new_values": jsonable_encoder(event["new_values"])}
+            for event in batch
+        ]
+        try:
+            await asyncio.to_thread(self.write_batch, rows)
+        except Exception as e:
+            logger.warning("Failed to write %d audit events (%s), retrying one by one", len(rows), e)
+            written = await asyncio.to_thread(self._write_rows, rows)
+        else:
+            written = len(rows)
+        AUDIT_WRITTEN.inc(written)
+
+    def _write_rows(self, rows: List[Dict]) -> int:
+        """Write rows individually, dropping only the ones that fail"""
+        written = 0
+        for row in rows:
+            try:
+                self.write_batch([row])
+            except Exception as e:
+                AUDIT_DROPPED.labels(reason="write_error").inc()
+                logger.error("Dropped audit event %r: %s", row, e)
+                continue
+            written += 1
+        return written
+
+
+audit_writer = AuditWriter()
+
+
+def audit(request: Request, action: str, entity_type: str = None, entity_id=None,
+          user_id=None, old_values: Dict = None, new_values: Dict = None):
+    """Record an audit event for the current request"""
+    if not settings.AUDIT_ENABLED:
+        return
+    audit_writer.record(
+        action, entity_type=entity_type, entity_id=entity_id, user_id=user_id,
+        old_values=old_values, new_values=new_values,
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent")
+    )
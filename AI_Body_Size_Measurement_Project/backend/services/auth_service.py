@@ -0,0 +1,181 @@
+"""
+Auth Service
+JWT issuance and verification with cached principal resolution
+
+Access tokens are verified locally (signature and expiry, no I/O). The
+user they name is resolved through a short-TTL in-process cache, so hot
+endpoints don't read the users table on every call. Changes to a user's
+active/admin flags invalidate the entry in this process; other processes
+pick them up within PRINCIPAL_CACHE_TTL.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from uuid import UUID
+import threading
+import time
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from prometheus_client import Counter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from config.database import get_db
+from config.settings import settings
+from models.user import User
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+# Columns a cached principal is built from; changing any of them invalidates it
+PRINCIPAL_FIELDS = ("email", "is_active", "is_admin")
+
+PRINCIPAL_LOOKUPS = Counter("auth_principal_lookups_total", "Principal resolutions", ["result"])
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/login")
+
+
+class AuthError(Exception):
+    """Raised when a token is missing, invalid, expired or of the wrong type"""
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user, as far as authorization needs to know"""
+    id: UUID
+    email: str
+    is_active: bool
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email,
+                   is_active=bool(user.is_active), is_admin=bool(user.is_admin))
+
+
+def _create_token(user_id, token_type: str, expires_delta: timedelta) -> str:
+    now = datetime.utcnow()
+    claims = {"sub": str(user_id), "type": token_type, "iat": now, "exp": now + expires_delta}
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def create_access_token(user_id) -> str:
+    return _create_token(user_id, ACCESS_TOKEN,
+                         timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+
+
+def create_refresh_token(user_id) -> str:
+    return _create_token(user_id, REFRESH_TOKEN,
+                         timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+
+
+def decode_token(token: str, token_type: str = ACCESS_TOKEN) -> UUID:
+    """Verify a token's signature, expiry and type; return the user id it names"""
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if claims.get("type") != token_type:
+            raise AuthError("Wrong token type")
+        return UUID(claims["sub"])
+    except (JWTError, KeyError, ValueError) as e:
+        raise AuthError("Invalid or expired token") from e
+
+
+class PrincipalCache:
+    """Bounded LRU of principals by user id, each entry valid for ttl seconds"""
+
+    def __init__(self, ttl: float = None, max_size: int = None):
+        self.ttl = settings.PRINCIPAL_CACHE_TTL if ttl is None else ttl
+        self.max_size = max_size or settings.PRINCIPAL_CACHE_SIZE
+        self._entries: "OrderedDict[UUID, tuple]" = OrderedDict()
+        # Invalidation runs from ORM flushes, which may be on worker threads
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+def resolve_principal(token: str, load_user: Callable[[UUID], Optional[User]],
+                      cache: PrincipalCache = principal_cache) -> Principal:
+    """Verify an access token and resolve its user, reading the database on a cache miss"""
+    user_id = decode_token(token, ACCESS_TOKEN)
+
+    principal = cache.get(user_id)
+    if principal is None:
+        PRINCIPAL_LOOKUPS.labels(result="miss").inc()
+        user = load_user(user_id)
+        if user is None:
+            raise AuthError("User not found")
+        principal = Principal.from_user(user)
+        cache.put(principal)
+    else:
+        PRINCIPAL_LOOKUPS.labels(result="hit").inc()
+
+    if not principal.is_active:
+        raise AuthError("User is inactive")
+    return principal
+
+
+def get_current_principal(token: str = Depends(oauth2_scheme),
+                          db: Session = Depends(get_db)) -> Principal:
+    """Dependency: the authenticated user, or 401"""
+    try:
+        return resolve_principal(token, lambda user_id: db.get(User, user_id))
+    except AuthError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+def get_current_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """Dependency: the authenticated user if they are an admin, or 403"""
+    if not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return principal
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_principal(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in PRINCIPAL_FIELDS):
+        principal_cache.invalidate(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
@@ -0,0 +1,159 @@
+"""
+Profile Body Model Service
+Keeps each profile's current body estimate up to date as measurements
+complete, are deleted or are rejected, so lookups read a single row.
+"""
+
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+
+from models.measurement import Measurement, ProfileBodyModel
+
+# Dimensions included in the running estimate
+BODY_MODEL_DIMENSIONS = [
+    'height', 'chest', 'bust', 'under_bust', 'waist', 'hip',
+    'shoulder_width', 'arm_length', 'inseam', 'outseam'
+]
+
+# Weight sums at or below this are treated as "no data" for a dimension
+_MIN_WEIGHT = 1e-9
+
+
+def _weight(measurement: Measurement) -> float:
+    """Measurements count by their landmark visibility (overall confidence).
+
+    A capture with no confidence recorded counts fully; one at 0% adds
+    nothing.
+    """
+    if measurement.overall_confidence is not None:
+        return float(measurement.overall_confidence) / 100
+    return 1.0
+
+
+def _general_size(measurement: Optional[Measurement]) -> Optional[str]:
+    if measurement is None or not measurement.size_recommendations:
+        return None
+    return measurement.size_recommendations[0].general_size
+
+
+def _lock_body_model(db: Session, profile_id) -> ProfileBodyModel:
+    """Get the profile's row locked for update, creating it if missing"""
+    body_model = (
+        db.query(ProfileBodyModel)
+        .filter(ProfileBodyModel.profile_id == profile_id)
+        .with_for_update()
+        .first()
+    )
+    if body_model is not None:
+        return body_model
+
+    try:
+        # The savepoint's flush inserts the row; a concurrent first
+        # measurement of the same profile makes it fail instead of the
+        # whole transaction
+        with db.begin_nested():
+            body_model = ProfileBodyModel(profile_id=profile_id, measurement_count=0,
+                                          estimates={}, weighted_sums={})
+            db.add(body_model)
+    except IntegrityError:
+        # The other transaction created it first; wait for its lock
+        body_model = (
+            db.query(ProfileBodyModel)
+            .filter(ProfileBodyModel.profile_id == profile_id)
+            .with_for_update()
+            .one()
+        )
+    return body_model
+
+
+def _accumulate(body_model: ProfileBodyModel, measurement: Measurement, sign: int):
+    """Add (sign=1) or remove (sign=-1) a measurement's contribution"""
+    weight = _weight(measurement) * sign
+    sums = dict(body_model.weighted_sums or {})
+    for dimension in BODY_MODEL_DIMENSIONS:
+        value = getattr(measurement, dimension)
+        if value is None:
+            continue
+        weighted_sum, weight_sum = sums.get(dimension, [0.0, 0.0])
+        sums[dimension] = [weighted_sum + weight * float(value), weight_sum + weight]
+
+    # Assign new dicts so the JSONB columns are flagged as changed
+    body_model.weighted_sums = sums
+    body_model.estimates = {
+        dimension: round(weighted_sum / weight_sum, 2)
+        for dimension, (weighted_sum, weight_sum) in sums.items()
+        if weight_sum > _MIN_WEIGHT
+    }
+    body_model.measurement_count = (body_model.measurement_count or 0) + sign
+
+
+def apply_measurement(db: Session, measurement: Measurement):
+    """Fold a completed measurement into its profile's body model"""
+    if measurement.profile_id is None or measurement.status != 'completed':
+        return
+
+    body_model = _lock_body_model(db, measurement.profile_id)
+    _accumulate(body_model, measurement, 1)
+
+    latest = (
+        db.get(Measurement, body_model.latest_measurement_id)
+        if body_model.latest_measurement_id else None
+    )
+    if latest is None or measurement.measurement_date >= latest.measurement_date:
+        body_model.latest_measurement_id = measurement.id
+        body_model.general_size = _general_size(measurement)
+
+
+def remove_measurement(db: Session, measurement: Measurement):
+    """Take a completed measurement back out of its profile's body model.
+
+    Call before the measurement is deleted or its status changes.
+    """
+    if measurement.profile_id is None or measurement.status != 'completed':
+        return
+
+    body_model = _lock_body_model(db, measurement.profile_id)
+    _accumulate(body_model, measurement, -1)
+
+    if body_model.latest_measurement_id == measurement.id:
+        latest = (
+            db.query(Measurement)
+            .options(selectinload(Measurement.size_recommendations))
+            .filter(
+                Measurement.profile_id == measurement.profile_id,
+                Measurement.status == 'completed',
+                Measurement.id != measurement.id
+            )
+            .order_by(Measurement.measurement_date.desc())
+            .first()
+        )
+        body_model.latest_measurement_id = latest.id if latest else None
+        body_model.general_size = _general_size(latest)
+
+
+def rebuild_body_model(db: Session, profile_id) -> ProfileBodyModel:
+    """Recompute a profile's body model from its full history"""
+    body_model = _lock_body_model(db, profile_id)
+    body_model.weighted_sums = {}
+    body_model.measurement_count = 0
+    body_model.latest_measurement_id = None
+    body_model.general_size = None
+
+    measurements = (
+        db.query(Measurement)
+        .options(selectinload(Measurement.size_recommendations))
+        .filter(Measurement.profile_id == profile_id, Measurement.status == 'completed')
+        .order_by(Measurement.measurement_date)
+        .all()
+    )
+    for measurement in measurements:
+        _accumulate(body_model, measurement, 1)
+    if measurements:
+        body_model.latest_measurement_id = measurements[-1].id
+        body_model.general_size = _general_size(measurements[-1])
+    else:
+        body_model.estimates = {}
+
+    return body_model
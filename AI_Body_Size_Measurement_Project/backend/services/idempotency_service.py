@@ -0,0 +1,206 @@
+"""
+Idempotency Service
+Collapses retried capture requests onto a single inference job
+
+A client sends the same Idempotency-Key with every retry of one capture.
+The first request claims the key and runs the job; later requests with
+the key replay its response, so a flaky network never causes a second
+Measurement row or inference run. A retry that arrives while the first
+request is still running gets 409 with Retry-After rather than waiting,
+so it does not hold a capture slot. A key reused with different
+parameters or image bytes is a conflict.
+"""
+
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+import hashlib
+import json
+import time
+
+from prometheus_client import Counter
+
+from config.settings import settings
+
+IDEMPOTENT_REQUESTS = Counter(
+    "idempotent_requests_total", "Requests carrying an Idempotency-Key", ["outcome"]
+)
+
+PENDING = "pending"
+DONE = "done"
+
+
+# Seconds a retry of an in-flight request is told to wait
+RETRY_AFTER_SECONDS = 1
+
+
+class IdempotencyConflict(Exception):
+    """Raised when a key cannot be replayed for this request"""
+
+
+class IdempotencyInProgress(IdempotencyConflict):
+    """Raised when the original request with this key is still running"""
+
+    def __init__(self, message: str, retry_after: int = RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def fingerprint(*parts) -> str:
+    """Stable hash of the request parameters that must match on replay"""
+    return hashlib.sha256(json.dumps([str(part) for part in parts]).encode()).hexdigest()
+
+
+class InMemoryIdempotencyStore:
+    """Idempotency records held in this process"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._records: Dict[str, Tuple[Dict, float]] = {}
+
+    def _get(self, key: str) -> Optional[Dict]:
+        entry = self._records.get(key)
+        if entry is None:
+            return None
+        record, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._records[key]
+            return None
+        return record
+
+    def _purge(self):
+        now = time.monotonic()
+        for key in [key for key, (_, expires_at) in self._records.items() if expires_at < now]:
+            del self._records[key]
+
+    async def claim(self, key: str, request_fingerprint: str) -> Optional[Dict]:
+        """Claim the key for this request; returns the existing record if already taken"""
+        record = self._get(key)
+        if record is not None:
+            return record
+        if len(self._records) >= self.max_keys:
+            self._purge()
+        self._records[key] = ({"state": PENDING, "fingerprint": request_fingerprint},
+                              time.monotonic() + settings.IDEMPOTENCY_LOCK_SECONDS)
+        return None
+
+    async def complete(self, key: str, record: Dict):
+        self._records[key] = ({**record, "state": DONE},
+                              time.monotonic() + settings.IDEMPOTENCY_TTL_SECONDS)
+
+    async def release(self, key: str):
+        self._records.pop(key, None)
+
+    async def close(self):
+        pass
+
+
+class RedisIdempotencyStore:
+    """Idempotency records shared by all replicas through Redis"""
+
+    def __init__(self, client=None, prefix: str = "idempotency:"):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(settings.REDIS_URL)
+        self.client = client
+        self.prefix = prefix
+
+    async def claim(self, key: str, request_fingerprint: str) -> Optional[Dict]:
+        record = {"state": PENDING, "fingerprint": request_fingerprint}
+        # The pending claim expires on its own if its owner dies mid-job
+        claimed = await self.client.set(self.prefix + key, json.dumps(record), nx=True,
+                                        ex=settings.IDEMPOTENCY_LOCK_SECONDS)
+        if claimed:
+            return None
+        existing = await self.client.get(self.prefix + key)
+        # Expired between SET and GET: the caller simply retries
+        return json.loads(existing) if existing else {"state": PENDING, "fingerprint": request_fingerprint}
+
+    async def complete(self, key: str, record: Dict):
+        await self.client.set(self.prefix + key, json.dumps({**record, "state": DONE}),
+                              ex=settings.IDEMPOTENCY_TTL_SECONDS)
+
+    async def release(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def close(self):
+        close = getattr(self.client, "aclose", None) or self.client.close
+        await close()
+
+
+def create_idempotency_store():
+    """Store selected by IDEMPOTENCY_BACKEND"""
+    if settings.IDEMPOTENCY_BACKEND == "redis":
+        return RedisIdempotencyStore()
+    return InMemoryIdempotencyStore()
+
+
+_store = None
+
+
+def get_idempotency_store():
+    """Get the shared idempotency store"""
+    global _store
+    if _store is None:
+        _store = create_idempotency_store()
+    return _store
+
+
+async def close_idempotency_store():
+    """Close the shared idempotency store"""
+    global _store
+    if _store is not None:
+        await _store.close()
+        _store = None
+
+
+async def _hash_stream(chunks: AsyncIterator[bytes], digest) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+async def run_once(store, key: str, request_fingerprint: str, chunks: AsyncIterator[bytes],
+                   job: Callable[[AsyncIterator[bytes]], Awaitable[Dict]]) -> Tuple[Dict, bool]:
+    """Run job(chunks) at most once per key and return (response body, replayed).
+
+    The owner streams the body through job while hashing it. Duplicates
+    of a completed request only hash their body (nothing is buffered) and
+    replay its response if the parameters and body hash both match;
+    duplicates of a running one fail fast with IdempotencyInProgress.
+    """
+    digest = hashlib.sha256()
+    existing = await store.claim(key, request_fingerprint)
+
+    if existing is None:
+        try:
+            body = await job(_hash_stream(chunks, digest))
+        except BaseException:
+            # Failed attempts are not remembered, so the client can retry
+            await store.release(key)
+            raise
+        await store.complete(key, {
+            "fingerprint": request_fingerprint,
+            "body_hash": digest.hexdigest(),
+            "body": body
+        })
+        IDEMPOTENT_REQUESTS.labels(outcome="executed").inc()
+        return body, False
+
+    if existing["fingerprint"] != request_fingerprint:
+        IDEMPOTENT_REQUESTS.labels(outcome="conflict").inc()
+        raise IdempotencyConflict("Idempotency-Key was already used with different parameters")
+
+    if existing["state"] != DONE:
+        IDEMPOTENT_REQUESTS.labels(outcome="in_progress").inc()
+        raise IdempotencyInProgress("A request with this Idempotency-Key is still being "
+                                    "processed; retry with the same key")
+
+    async for chunk in chunks:
+        digest.update(chunk)
+
+    record = existing
+    if record["body_hash"] != digest.hexdigest():
+        IDEMPOTENT_REQUESTS.labels(outcome="conflict").inc()
+        raise IdempotencyConflict("Idempotency-Key was already used with a different image")
+
+    IDEMPOTENT_REQUESTS.labels(outcome="replayed").inc()
+    return record["body"], True
@@ -0,0 +1,49 @@
+"""
+Measurement Service
+Measurement queries shared by routes and jobs
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from models.measurement import Measurement
+
+
+def query_measurement_history(db: Session, user_id, profile_id=None,
+                              date_from: Optional[datetime] = None,
+                              date_to: Optional[datetime] = None,
+                              skip: int = 0, limit: int = 20) -> List[Measurement]:
+    """Get a page of a user's measurements, newest first.
+
+    date_from is inclusive and date_to exclusive, so consecutive ranges
+    never return a measurement twice; for a whole day D pass
+    date_from=D and date_to=D + 1 day.
+
+    The profile is joined into the page query and size recommendations are
+    loaded with one batched IN query, so the number of round trips does
+    not grow with the page size.
+    """
+    query = (
+        db.query(Measurement)
+        .options(
+            joinedload(Measurement.profile),
+            selectinload(Measurement.size_recommendations)
+        )
+        .filter(Measurement.user_id == user_id)
+    )
+
+    if profile_id is not None:
+        query = query.filter(Measurement.profile_id == profile_id)
+    if date_from is not None:
+        query = query.filter(Measurement.measurement_date >= date_from)
+    if date_to is not None:
+        query = query.filter(Measurement.measurement_date < date_to)
+
+    return (
+        query.order_by(Measurement.measurement_date.desc(), Measurement.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
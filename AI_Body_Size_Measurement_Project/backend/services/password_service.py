@@ -0,0 +1,91 @@
+"""
+Password Service
+bcrypt hashing and verification off the event loop
+
+Each hash or verify costs tens to hundreds of milliseconds of CPU, so it
+runs in a dedicated, bounded thread pool (bcrypt releases the GIL) instead
+of inside the async route. A login storm then queues on the pool while
+every other endpoint keeps being served.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+import asyncio
+
+from passlib.context import CryptContext
+
+from config.settings import settings
+
+# Hashes at any other cost are flagged for rehash, so changing
+# BCRYPT_ROUNDS migrates users transparently as they log in
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """Return the shared hashing pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _executor
+
+
+def shutdown_hash_executor():
+    """Stop the hashing pool, waiting for calls already running"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password at the configured cost"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), pwd_context.hash, password)
+
+
+async def verify_password(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password against its stored hash.
+
+    Returns (valid, new_hash). new_hash is set when the stored hash uses a
+    different cost than BCRYPT_ROUNDS, so the caller can save the rehash.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            get_hash_executor(), pwd_context.verify_and_update, password, password_hash
+        )
+    except ValueError:
+        # Not a recognised hash (e.g. a legacy plaintext value)
+        return False, None
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    # Made on first use rather than at import, so start-up pays no bcrypt cost
+    return pwd_context.hash("not-a-real-password")
+
+
+def _verify_dummy(password: str):
+    pwd_context.verify(password, _dummy_hash())
+
+
+async def verify_dummy_password(password: str):
+    """Spend the bcrypt work of a real verify on an account that does not exist.
+
+    An unknown email then takes as long as a wrong password, so response
+    times do not reveal which emails are registered.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(get_hash_executor(), _verify_dummy, password)
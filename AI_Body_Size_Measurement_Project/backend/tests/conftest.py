@@ -0,0 +1,127 @@
+"""
+Test Fixtures
+Runs the API in-process against an in-memory SQLite database
+
+The AI server is replaced by an httpx transport that answers /api/measure
+with fixed measurements, so the suite needs no other services.
+Run from backend/: python -m pytest
+"""
+
+import base64
+import os
+import uuid
+
+# Must be set before config.settings is imported
+os.environ.update({
+    "DATABASE_URL": "sqlite://",
+    "ENVIRONMENT": "test",
+    "BCRYPT_ROUNDS": "4",
+    "RATE_LIMIT_BACKEND": "memory",
+    "IDEMPOTENCY_BACKEND": "memory",
+    "PROFILER_ENABLED": "False",
+})
+
+import httpx
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from config.database import Base, SessionLocal, engine
+from models.measurement import MeasurementProfile
+from services import ai_service
+from services.auth_service import principal_cache
+
+PASSWORD = "correct horse battery staple"
+
+MALE_MEASUREMENTS = {
+    "height": 175.0, "chest": 98.0, "waist": 82.0, "hip": 96.0,
+    "shoulder_width": 44.0, "arm_length": 60.0, "inseam": 80.0, "outseam": 104.0
+}
+
+
+class FakeAIServer(httpx.AsyncBaseTransport):
+    """Stands in for the AI server's /api/measure"""
+
+    def __init__(self):
+        self.calls = 0
+        self.measurements = dict(MALE_MEASUREMENTS)
+        self.size = "M"
+        self.confidence = 0.9
+        self.timings_ms = {"decode": 1.5, "detect": 20.0}
+        self.headers = None  # Of the last request
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        self.headers = request.headers
+        # Drain the streamed image like the real server would
+        async for _ in request.stream:
+            pass
+        return httpx.Response(200, json={
+            "success": True,
+            "measurements": self.measurements,
+            "confidence": self.confidence,
+            "size_recommendation": self.size,
+            "model_version": "test",
+            "landmarks": base64.b64encode(np.zeros((33, 4), np.float32).tobytes()).decode(),
+            "timings_ms": self.timings_ms,
+        })
+
+
+@pytest.fixture
+def fake_ai():
+    return FakeAIServer()
+
+
+@pytest.fixture
+def client(fake_ai):
+    ai_service._client = ai_service.AIServiceClient(transport=fake_ai)
+    with TestClient(app_module.app) as client:
+        yield client
+
+    # The lifespan has flushed the audit log; start the next test empty
+    principal_cache.clear()
+    app_module.rate_limit_store._buckets.clear()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def register(client, email: str = None) -> dict:
+    """Register and log in a user; returns the login response body"""
+    email = email or f"user-{uuid.uuid4().hex[:8]}@example.com"
+    response = client.post("/api/users/register", json={
+        "email": email, "password": PASSWORD,
+        "first_name": "Test", "last_name": "User", "gender": "male"
+    })
+    assert response.status_code == 201, response.text
+    response = client.post("/api/users/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def auth_headers(login: dict) -> dict:
+    return {"Authorization": f"Bearer {login['access_token']}"}
+
+
+def capture(client, login: dict, image: bytes = b"\xff\xd8fake-jpeg", **params):
+    """POST a capture as the given user"""
+    headers = {**auth_headers(login), "Content-Type": "image/jpeg",
+               **params.pop("headers", {})}
+    return client.post("/api/measurements/capture", content=image, headers=headers,
+                       params={"gender": "male", **params})
+
+
+def create_profile(db, login: dict, name: str = "Me") -> MeasurementProfile:
+    profile = MeasurementProfile(user_id=uuid.UUID(login["user"]["id"]),
+                                 profile_name=name, gender="male")
+    db.add(profile)
+    db.commit()
+    return profile
@@ -0,0 +1,79 @@
+"""
+Audit Writer Tests
+Batching, bad rows and restarts of the buffered audit-log writer
+"""
+
+import asyncio
+
+from services.audit_service import AuditWriter, normalize_ip
+
+
+class FakeAuditTable:
+    """Collects written rows; rejects rows whose action is 'bad'"""
+
+    def __init__(self):
+        self.rows = []
+        self.batches = 0
+
+    def write_batch(self, rows):
+        self.batches += 1
+        if any(row["action"] == "bad" for row in rows):
+            raise ValueError("rejected by the database")
+        self.rows.extend(rows)
+
+
+async def record_and_stop(writer: AuditWriter, actions):
+    await writer.start()
+    for action in actions:
+        writer.record(action, ip_address="10.0.0.1")
+    await writer.stop()
+
+
+def test_events_are_written_in_batches():
+    table = FakeAuditTable()
+    writer = AuditWriter(table.write_batch, batch_size=10, flush_interval=60)
+
+    asyncio.run(record_and_stop(writer, [f"event.{i}" for i in range(25)]))
+
+    assert [row["action"] for row in table.rows] == [f"event.{i}" for i in range(25)]
+    assert table.batches == 3
+
+
+def test_bad_row_only_drops_itself():
+    table = FakeAuditTable()
+    writer = AuditWriter(table.write_batch, batch_size=10, flush_interval=60)
+
+    asyncio.run(record_and_stop(writer, ["ok.1", "bad", "ok.2"]))
+
+    assert [row["action"] for row in table.rows] == ["ok.1", "ok.2"]
+
+
+def test_writer_restarts_on_a_new_event_loop():
+    table = FakeAuditTable()
+    writer = AuditWriter(table.write_batch, flush_interval=60)
+
+    asyncio.run(record_and_stop(writer, ["first"]))
+    asyncio.run(record_and_stop(writer, ["second"]))
+
+    assert [row["action"] for row in table.rows] == ["first", "second"]
+
+
+def test_non_ip_client_hosts_are_not_stored():
+    assert normalize_ip("203.0.113.7") == "203.0.113.7"
+    assert normalize_ip("2001:db8::1") == "2001:db8::1"
+    assert normalize_ip("testclient") is None
+    assert normalize_ip(None) is None
+
+
+def test_stop_does_not_wait_for_flush_interval():
+    table = FakeAuditTable()
+    writer = AuditWriter(table.write_batch, flush_interval=60)
+
+    async def run():
+        await writer.start()
+        await asyncio.sleep(0.01)  # The flusher is now waiting on an empty queue
+        writer.record("late")
+        await asyncio.wait_for(writer.stop(), 1)
+
+    asyncio.run(run())
+    assert [row["action"] for row in table.rows] == ["late"]
@@ -0,0 +1,55 @@
+"""
+Database Metrics Tests
+Per-request statement counts and timings
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from middleware import db_metrics, tracing
+from middleware.db_metrics import KEPT_STATEMENTS, RequestDBStats, instrument_engine
+
+
+def statements_observed(count: str) -> float:
+    return REGISTRY.get_sample_value("db_statements_per_request_bucket", {"le": count}) or 0.0
+
+
+def test_only_first_statements_are_kept():
+    stats = RequestDBStats()
+    for i in range(1000):
+        stats.record(f"SELECT {i}", 0.001)
+
+    assert stats.count == 1000
+    assert stats.statements == [f"SELECT {i}" for i in range(KEPT_STATEMENTS)]
+
+
+def test_requests_without_sql_are_observed(client):
+    before = statements_observed("0.0")
+    response = client.get("/health")
+
+    assert response.headers["x-db-statements"] == "0"
+    assert statements_observed("0.0") == before + 1
+
+
+def test_one_timing_feeds_stats_and_trace():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    assert len(engine.dispatch.before_cursor_execute) == 1
+    assert len(engine.dispatch.after_cursor_execute) == 1
+
+    stats, trace = RequestDBStats(), tracing.Trace("request")
+    stats_token = db_metrics._current_stats.set(stats)
+    trace_token = tracing._current_trace.set(trace)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    finally:
+        db_metrics._current_stats.reset(stats_token)
+        tracing._current_trace.reset(trace_token)
+        engine.dispose()
+
+    assert stats.count == 2
+    assert [span["statement"] for span in trace.spans] == ["SELECT 1", "SELECT 2"]
+    assert trace.stages["db"] == pytest.approx(stats.db_time * 1000)
@@ -0,0 +1,156 @@
+"""
+Idempotency-Key Tests
+Retried captures replay the first response instead of measuring again,
+through the route and directly on both stores (in memory and on a fake Redis)
+"""
+
+import asyncio
+
+import pytest
+
+from config.settings import settings
+from services.idempotency_service import (
+    IdempotencyConflict, IdempotencyInProgress, InMemoryIdempotencyStore,
+    RedisIdempotencyStore, fingerprint, run_once
+)
+from conftest import auth_headers, capture, register
+
+
+def test_retry_replays_first_response(client, fake_ai):
+    login = register(client)
+    key = {"Idempotency-Key": "capture-1"}
+
+    first = capture(client, login, headers=key)
+    retry = capture(client, login, headers=key)
+
+    assert first.status_code == retry.status_code == 201
+    assert first.headers["Idempotent-Replayed"] == "false"
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert fake_ai.calls == 1
+    assert len(client.get("/api/measurements/", headers=auth_headers(login)).json()) == 1
+
+
+def test_key_reused_with_different_image(client, fake_ai):
+    login = register(client)
+    key = {"Idempotency-Key": "capture-1"}
+
+    assert capture(client, login, image=b"first", headers=key).status_code == 201
+    response = capture(client, login, image=b"second", headers=key)
+    assert response.status_code == 409
+    assert "different image" in response.json()["detail"]
+    assert fake_ai.calls == 1
+
+
+def test_key_reused_with_different_parameters(client, fake_ai):
+    login = register(client)
+    key = {"Idempotency-Key": "capture-1"}
+
+    assert capture(client, login, headers=key).status_code == 201
+    response = capture(client, login, headers=key, reference_height=180)
+    assert response.status_code == 409
+    assert "different parameters" in response.json()["detail"]
+
+
+def test_keys_are_scoped_per_user(client, fake_ai):
+    key = {"Idempotency-Key": "capture-1"}
+    first = capture(client, register(client), headers=key)
+    second = capture(client, register(client), headers=key)
+
+    assert second.headers["Idempotent-Replayed"] == "false"
+    assert second.json()["id"] != first.json()["id"]
+    assert fake_ai.calls == 2
+
+
+def test_overlong_key_rejected(client):
+    response = capture(client, register(client), headers={"Idempotency-Key": "k" * 256})
+    assert response.status_code == 400
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "memory":
+        return InMemoryIdempotencyStore()
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisIdempotencyStore(fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer()))
+
+
+async def body(data: bytes = b"image"):
+    yield data
+
+
+def test_store_replays_completed_request(store):
+    request = fingerprint("male", None, 170.0)
+    runs = []
+
+    async def job(chunks):
+        async for _ in chunks:
+            pass
+        runs.append(1)
+        return {"id": len(runs)}
+
+    async def run():
+        assert await run_once(store, "capture:1", request, body(), job) == ({"id": 1}, False)
+        assert await run_once(store, "capture:1", request, body(), job) == ({"id": 1}, True)
+        with pytest.raises(IdempotencyConflict, match="different image"):
+            await run_once(store, "capture:1", request, body(b"other"), job)
+        with pytest.raises(IdempotencyConflict, match="different parameters"):
+            await run_once(store, "capture:1", fingerprint("female", None, 170.0), body(), job)
+
+    asyncio.run(run())
+    assert len(runs) == 1
+
+
+def test_store_forgets_failed_request(store):
+    request = fingerprint("male", None, 170.0)
+
+    async def failing_job(chunks):
+        raise RuntimeError("AI server unavailable")
+
+    async def job(chunks):
+        return {"id": 2}
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await run_once(store, "capture:1", request, body(), failing_job)
+        assert await run_once(store, "capture:1", request, body(), job) == ({"id": 2}, False)
+
+    asyncio.run(run())
+
+
+def test_redis_records_expire():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+    store = RedisIdempotencyStore(client)
+
+    async def run():
+        assert await store.claim("capture:1", "request") is None
+        assert await client.ttl("idempotency:capture:1") == settings.IDEMPOTENCY_LOCK_SECONDS
+        await store.complete("capture:1", {"fingerprint": "request", "body": {}})
+        assert await client.ttl("idempotency:capture:1") == settings.IDEMPOTENCY_TTL_SECONDS
+
+    asyncio.run(run())
+
+
+def test_duplicate_of_running_request_does_not_wait(store):
+    request = fingerprint("male", None, 170.0)
+    release = asyncio.Event()
+
+    async def job(chunks):
+        async for _ in chunks:
+            pass
+        await release.wait()
+        return {"id": 1}
+
+    async def run():
+        owner = asyncio.create_task(run_once(store, "capture:1", request, body(), job))
+        await asyncio.sleep(0.01)  # The owner has claimed the key and is measuring
+        with pytest.raises(IdempotencyInProgress) as e:
+            await asyncio.wait_for(run_once(store, "capture:1", request, body(), job), 1)
+        assert e.value.retry_after >= 1
+
+        release.set()
+        assert await owner == ({"id": 1}, False)
+        assert await run_once(store, "capture:1", request, body(), job) == ({"id": 1}, True)
+
+    asyncio.run(run())
@@ -0,0 +1,149 @@
+"""
+Measurement Route Tests
+Capture through the (faked) AI server, upload limits, history, ownership checks
+"""
+
+from datetime import datetime, timedelta
+import uuid
+
+import pytest
+
+from config.settings import settings
+from models.measurement import Measurement, SizeRecommendation
+from conftest import auth_headers, capture, create_profile, register
+
+
+def test_capture_stores_measurement(client, fake_ai):
+    login = register(client)
+
+    response = capture(client, login)
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert body["chest"] == 98.0
+    assert body["bust"] is None  # Not measured for male captures
+    assert body["overall_confidence"] == 90.0
+    assert body["status"] == "completed"
+    assert "Idempotent-Replayed" not in response.headers
+    assert fake_ai.calls == 1
+
+    response = client.get("/api/measurements/", headers=auth_headers(login))
+    assert [item["id"] for item in response.json()] == [body["id"]]
+
+
+def test_capture_female_has_no_chest(client, fake_ai):
+    login = register(client)
+    fake_ai.measurements = {"height": 165.0, "bust": 88.0, "under_bust": 75.0, "waist": 70.0}
+
+    response = capture(client, login, gender="female")
+    assert response.status_code == 201, response.text
+    assert response.json()["chest"] is None
+    assert response.json()["bust"] == 88.0
+
+
+def test_capture_rejects_invalid_gender(client, fake_ai):
+    response = capture(client, register(client), gender="other")
+    assert response.status_code == 400
+    assert fake_ai.calls == 0
+
+
+@pytest.fixture
+def small_uploads(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 1024)
+
+
+def chunked(data: bytes, size: int = 256):
+    """Request body without a Content-Length, sent as chunked transfer encoding"""
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_oversized_upload_rejected_by_content_length(client, db, fake_ai, small_uploads):
+    response = capture(client, register(client), image=b"x" * 1025)
+    assert response.status_code == 413
+    assert fake_ai.calls == 0  # Refused before anything is forwarded
+    assert db.query(Measurement).count() == 0
+
+
+def test_oversized_chunked_upload_rejected_while_streaming(client, db, fake_ai, small_uploads):
+    login = register(client)
+
+    response = capture(client, login, image=chunked(b"x" * 1025))
+    assert response.status_code == 413
+    assert db.query(Measurement).count() == 0
+
+    assert capture(client, login, image=chunked(b"x" * 1024)).status_code == 201
+
+
+def test_oversized_idempotent_upload_can_be_retried(client, db, small_uploads):
+    login = register(client)
+    headers = {"Idempotency-Key": "capture-1"}
+
+    for image in (b"x" * 1025, chunked(b"x" * 1025)):
+        response = capture(client, login, image=image, headers=headers)
+        assert response.status_code == 413
+    assert db.query(Measurement).count() == 0
+
+    # The failed attempts did not claim the key
+    response = capture(client, login, image=b"x" * 1024, headers=headers)
+    assert response.status_code == 201
+    assert response.headers["Idempotent-Replayed"] == "false"
+
+
+def test_capture_requires_token(client):
+    response = client.post("/api/measurements/capture", params={"gender": "male"}, content=b"x")
+    assert response.status_code == 401
+
+
+def test_other_users_measurements_are_hidden(client):
+    owner, other = register(client), register(client)
+    measurement_id = capture(client, owner).json()["id"]
+
+    path = f"/api/measurements/{measurement_id}"
+    assert client.get(path, headers=auth_headers(other)).status_code == 404
+    assert client.delete(path, headers=auth_headers(other)).status_code == 404
+    assert client.get(path, headers=auth_headers(owner)).status_code == 200
+    assert client.delete(path, headers=auth_headers(owner)).status_code == 204
+    assert client.get(path, headers=auth_headers(owner)).status_code == 404
+
+
+def seed_history(db, login: dict, count: int):
+    user_id = uuid.UUID(login["user"]["id"])
+    profile = create_profile(db, login)
+    start = datetime(2024, 1, 1)
+    for day in range(count):
+        measurement = Measurement(user_id=user_id, profile_id=profile.id, gender="male",
+                                  chest=90 + day, measurement_date=start + timedelta(days=day))
+        measurement.size_recommendations.append(SizeRecommendation(general_size="M"))
+        db.add(measurement)
+    db.commit()
+
+
+def test_history_query_count_does_not_grow_with_page(client, db):
+    login = register(client)
+    seed_history(db, login, 30)
+    headers = auth_headers(login)
+    client.get("/api/measurements/history", headers=headers)  # Warm the principal cache
+
+    counts = {}
+    for limit in (3, 30):
+        response = client.get("/api/measurements/history", params={"limit": limit},
+                              headers=headers)
+        assert response.status_code == 200
+        items = response.json()
+        assert len(items) == limit
+        assert items[0]["profile"]["profile_name"] == "Me"
+        assert items[0]["size_recommendations"][0]["general_size"] == "M"
+        counts[limit] = int(response.headers["x-db-statements"])
+
+    assert counts[3] == counts[30] <= 3
+
+
+def test_history_filters(client, db):
+    login = register(client)
+    seed_history(db, login, 10)
+
+    response = client.get("/api/measurements/history", headers=auth_headers(login), params={
+        "date_from": "2024-01-03T00:00:00", "date_to": "2024-01-06T00:00:00"
+    })
+    dates = [item["measurement_date"][:10] for item in response.json()]
+    assert dates == ["2024-01-05", "2024-01-04", "2024-01-03"]
@@ -0,0 +1,126 @@
+"""
+Sampling Profiler Tests
+Session lifecycle of the on-demand profiler and its admin endpoints
+"""
+
+import sys
+import threading
+import time
+import uuid
+
+import pytest
+
+from config.settings import settings
+from middleware.profiler import SamplingProfiler
+from models.user import User
+from services.auth_service import principal_cache
+from conftest import auth_headers, register
+
+
+def wait_until_finished(profiler: SamplingProfiler, timeout: float = 2):
+    deadline = time.monotonic() + timeout
+    while profiler.status()["state"] != "finished" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert profiler.status()["state"] == "finished"
+
+
+def busy(seconds: float):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def test_timed_session_samples_until_its_deadline():
+    profiler = SamplingProfiler(interval=0.001, max_seconds=5)
+    profiler.start_timed(0.1)
+    assert profiler.status()["state"] == "running"
+    with pytest.raises(RuntimeError):
+        profiler.start_timed(1)
+
+    busy(0.1)
+    wait_until_finished(profiler)
+    assert profiler.status()["samples"] > 0
+    assert any(row["function"].startswith("busy ") for row in profiler.top())
+
+
+def test_request_session_samples_only_its_requests():
+    profiler = SamplingProfiler(interval=0.001, max_seconds=5, track_threads=True)
+    profiler.start_requests(2)
+    time.sleep(0.05)
+    assert profiler.status()["samples"] == 0  # Nothing samples before a request
+
+    def handle_request():
+        profiled = profiler.request_started()
+        busy(0.05)
+        profiler.request_finished(profiled)
+        return profiled
+
+    results = []
+    for _ in range(2):
+        thread = threading.Thread(target=lambda: results.append(handle_request()))
+        thread.start()
+        thread.join()
+
+    wait_until_finished(profiler)
+    assert results == [True, True]
+    assert profiler.status()["remaining_requests"] == 0
+    assert profiler.status()["samples"] > 0
+    assert profiler.request_started() is False
+
+
+def test_request_session_without_requests_expires():
+    profiler = SamplingProfiler(interval=0.001, max_seconds=0.05)
+    profiler.start_requests(3)
+    time.sleep(0.1)
+
+    assert profiler.status()["state"] == "finished"
+    assert profiler.request_started() is False
+    profiler.start_timed(0.01)  # Not blocked by the expired session
+    wait_until_finished(profiler)
+
+
+@pytest.mark.parametrize("start", [
+    lambda profiler: profiler.start_timed(5),
+    lambda profiler: profiler.start_requests(5),
+])
+def test_cancel_ends_session(start):
+    profiler = SamplingProfiler(interval=0.001, max_seconds=5)
+    start(profiler)
+
+    began = time.monotonic()
+    assert profiler.cancel() is True
+    assert time.monotonic() - began < 1
+    assert profiler.status()["state"] == "finished"
+    assert profiler.cancel() is False
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_failed_session_is_not_left_running(monkeypatch):
+    def broken_frames():
+        raise RuntimeError("sampling failed")
+
+    monkeypatch.setattr(sys, "_current_frames", broken_frames)
+    profiler = SamplingProfiler(interval=0.001, max_seconds=5)
+    profiler.start_timed(5)
+    wait_until_finished(profiler)
+
+
+def test_admin_can_cancel_session(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_ENABLED", True)
+    login = register(client)
+    db.get(User, uuid.UUID(login["user"]["id"])).is_admin = True
+    db.commit()
+    principal_cache.clear()
+    headers = auth_headers(login)
+
+    response = client.post("/api/admin/profiler", json={"requests": 5}, headers=headers)
+    assert response.status_code == 202
+    response = client.delete("/api/admin/profiler", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["state"] == "finished"
+    assert client.delete("/api/admin/profiler", headers=headers).status_code == 409
+
+    # A new session can start straight away
+    assert client.post("/api/admin/profiler", json={"seconds": 0.01},
+                       headers=headers).status_code == 202
+    client.delete("/api/admin/profiler", headers=headers)
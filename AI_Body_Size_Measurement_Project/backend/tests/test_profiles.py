@@ -0,0 +1,123 @@
+"""
+Profile Route Tests
+The per-profile body model behind the current-size lookup
+"""
+
+from sqlalchemy.orm import Query
+
+from models.measurement import Measurement, ProfileBodyModel
+from services.body_model_service import _lock_body_model
+from conftest import auth_headers, capture, create_profile, register
+
+
+def current_size(client, login: dict, profile_id):
+    return client.get(f"/api/profiles/{profile_id}/current-size", headers=auth_headers(login))
+
+
+def test_current_size_follows_captures(client, fake_ai, db):
+    login = register(client)
+    profile = create_profile(db, login)
+
+    fake_ai.measurements = {"height": 170.0, "chest": 96.0}
+    fake_ai.confidence = 0.9
+    capture(client, login, profile_id=str(profile.id))
+    fake_ai.measurements = {"height": 174.0, "chest": 100.0}
+    fake_ai.confidence = 0.6
+    fake_ai.size = "L"
+    latest = capture(client, login, profile_id=str(profile.id)).json()
+
+    body = current_size(client, login, profile.id).json()
+    assert body["measurement_count"] == 2
+    assert body["general_size"] == "L"
+    assert body["latest_measurement_id"] == latest["id"]
+    # Weighted by each capture's confidence: (96 * 0.9 + 100 * 0.6) / 1.5
+    assert body["estimates"]["chest"] == 97.6
+
+    # Deleting the latest capture takes it back out of the estimate
+    client.delete(f"/api/measurements/{latest['id']}", headers=auth_headers(login))
+    body = current_size(client, login, profile.id).json()
+    assert body["measurement_count"] == 1
+    assert body["general_size"] == "M"
+    assert body["estimates"] == {"height": 170.0, "chest": 96.0}
+
+
+def test_zero_confidence_capture_adds_nothing(client, fake_ai, db):
+    login = register(client)
+    profile = create_profile(db, login)
+
+    fake_ai.measurements = {"chest": 96.0}
+    capture(client, login, profile_id=str(profile.id))
+    fake_ai.measurements = {"chest": 200.0}
+    fake_ai.confidence = 0.0
+    capture(client, login, profile_id=str(profile.id))
+
+    body = current_size(client, login, profile.id).json()
+    assert body["measurement_count"] == 2
+    assert body["estimates"] == {"chest": 96.0}
+
+
+def test_current_size_unknown_profile(client):
+    response = current_size(client, register(client), "00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
+
+
+def test_current_size_requires_owner(client, db):
+    owner, other = register(client), register(client)
+    profile = create_profile(db, owner)
+
+    response = client.get(f"/api/profiles/{profile.id}/current-size")
+    assert response.status_code == 401
+    assert current_size(client, other, profile.id).status_code == 404
+    response = client.post(f"/api/profiles/{profile.id}/current-size/rebuild",
+                           headers=auth_headers(other))
+    assert response.status_code == 404
+
+
+def test_capture_into_other_users_profile_rejected(client, fake_ai, db):
+    owner, other = register(client), register(client)
+    profile = create_profile(db, owner)
+
+    response = capture(client, other, profile_id=str(profile.id))
+    assert response.status_code == 404
+    assert fake_ai.calls == 0
+    assert current_size(client, owner, profile.id).json()["measurement_count"] == 0
+
+
+def test_current_size_lookup_does_not_write(client, db):
+    login = register(client)
+    profile = create_profile(db, login)
+
+    body = current_size(client, login, profile.id).json()
+    assert body["measurement_count"] == 0
+    assert body["estimates"] == {}
+    assert db.get(ProfileBodyModel, profile.id) is None
+
+
+def test_rebuild_from_existing_measurements(client, db):
+    login = register(client)
+    profile = create_profile(db, login)
+    # Measured before body models existed: no profile_body_models row
+    db.add(Measurement(user_id=profile.user_id, profile_id=profile.id, gender="male",
+                       chest=99, overall_confidence=80))
+    db.commit()
+
+    response = client.post(f"/api/profiles/{profile.id}/current-size/rebuild",
+                           headers=auth_headers(login))
+    assert response.status_code == 200
+    assert response.json()["estimates"] == {"chest": 99.0}
+    assert current_size(client, login, profile.id).json()["measurement_count"] == 1
+
+
+def test_concurrent_first_measurement_reuses_row(client, db, monkeypatch):
+    login = register(client)
+    profile = create_profile(db, login)
+    db.add(ProfileBodyModel(profile_id=profile.id, measurement_count=3,
+                            estimates={}, weighted_sums={}))
+    db.commit()
+
+    # Another transaction inserts the row after this one's SELECT found none
+    monkeypatch.setattr(Query, "first", lambda self: None)
+    body_model = _lock_body_model(db, profile.id)
+
+    assert body_model.measurement_count == 3
+    db.commit()  # The failed insert was confined to its savepoint
@@ -0,0 +1,139 @@
+"""
+Admission Control Tests
+Per-user and global token buckets on captures, and the bucket stores
+themselves (in memory and on a fake Redis)
+"""
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from config.settings import Settings, settings
+from middleware.rate_limit import InMemoryTokenBucketStore, RedisTokenBucketStore
+from conftest import capture, register
+
+
+def test_user_over_budget_gets_429_with_retry_after(client, fake_ai, monkeypatch):
+    monkeypatch.setattr(settings, "CAPTURE_BURST_PER_USER", 2)
+    monkeypatch.setattr(settings, "CAPTURE_RATE_PER_USER", 0.1)
+    login = register(client)
+
+    assert [capture(client, login).status_code for _ in range(2)] == [201, 201]
+    response = capture(client, login)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 10
+    assert fake_ai.calls == 2
+
+    # Other users have their own bucket
+    assert capture(client, register(client)).status_code == 201
+
+
+def test_global_bucket_limits_all_users(client, monkeypatch):
+    monkeypatch.setattr(settings, "CAPTURE_BURST_GLOBAL", 1)
+    monkeypatch.setattr(settings, "CAPTURE_RATE_GLOBAL", 0.5)
+
+    assert capture(client, register(client)).status_code == 201
+    response = capture(client, register(client))
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == 2
+
+
+def test_other_routes_are_not_limited(client, monkeypatch):
+    monkeypatch.setattr(settings, "CAPTURE_BURST_GLOBAL", 1)
+    for _ in range(5):
+        assert client.get("/health").status_code == 200
+
+
+@pytest.fixture(params=["memory", "redis"])
+def bucket_store(request):
+    if request.param == "memory":
+        return InMemoryTokenBucketStore()
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisTokenBucketStore(fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer()))
+
+
+def test_store_allows_burst_then_rejects(bucket_store):
+    bucket = ("user:1", 3, 0.5)
+
+    async def run():
+        results = [await bucket_store.take([bucket]) for _ in range(4)]
+        assert results[:3] == [(None, 0.0)] * 3
+        rejected, retry_after = results[3]
+        assert rejected == 0
+        assert retry_after == pytest.approx(2, abs=0.05)
+
+    asyncio.run(run())
+
+
+def test_store_refills_at_rate(bucket_store):
+    bucket = ("user:1", 1, 20.0)
+
+    async def run():
+        assert (await bucket_store.take([bucket]))[0] is None
+        assert (await bucket_store.take([bucket]))[0] == 0
+        await asyncio.sleep(0.1)  # Two tokens' worth, capped at capacity 1
+        assert (await bucket_store.take([bucket]))[0] is None
+        assert (await bucket_store.take([bucket]))[0] == 0
+
+    asyncio.run(run())
+
+
+def test_store_rejection_leaves_every_bucket_unchanged(bucket_store):
+    user, global_bucket = ("user:1", 5, 0.001), ("global", 2, 0.001)
+
+    async def run():
+        assert await bucket_store.take([user, global_bucket], cost=2) == (None, 0.0)
+        # The global bucket is now empty: nothing may be taken from user:1
+        rejected, retry_after = await bucket_store.take([user, global_bucket], cost=2)
+        assert rejected == 1 and retry_after > 1000
+        assert (await bucket_store.take([user], cost=3))[0] is None
+        assert (await bucket_store.take([user]))[0] == 0
+
+    asyncio.run(run())
+
+
+def test_store_retry_after_covers_every_short_bucket(bucket_store):
+    async def run():
+        await bucket_store.take([("user:1", 1, 1.0), ("global", 1, 0.25)])
+        rejected, retry_after = await bucket_store.take([("user:1", 1, 1.0), ("global", 1, 0.25)])
+        assert rejected == 0
+        assert retry_after == pytest.approx(4, abs=0.05)
+
+    asyncio.run(run())
+
+
+def test_redis_buckets_expire_once_full_again():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+    store = RedisTokenBucketStore(client)
+
+    async def run():
+        await store.take([("user:1", 5, 0.5), ("global", 50, 20.0)])
+        assert await client.ttl("ratelimit:user:1") == 11
+        assert await client.ttl("ratelimit:global") == 4
+        # Rejected requests write nothing
+        await store.take([("user:2", 1, 1.0), ("global", 0, 20.0)])
+        assert not await client.exists("ratelimit:user:2")
+
+    asyncio.run(run())
+
+
+def test_global_rejection_does_not_spend_user_token():
+    store = InMemoryTokenBucketStore()
+    global_bucket = ("global", 1, 0.001)
+
+    async def run():
+        assert await store.take([("user:1", 1, 0.001), global_bucket]) == (None, 0.0)
+        rejected, retry_after = await store.take([("user:2", 1, 0.001), global_bucket])
+        assert rejected == 1 and retry_after > 1
+
+    asyncio.run(run())
+    assert "user:2" not in store._buckets
+
+
+def test_zero_rates_rejected_at_startup():
+    for name in ("CAPTURE_RATE_PER_USER", "CAPTURE_RATE_GLOBAL", "CAPTURE_BURST_GLOBAL",
+                 "MAX_INFLIGHT_AI_CALLS"):
+        with pytest.raises(ValidationError):
+            Settings(**{name: 0})
@@ -0,0 +1,60 @@
+"""
+Schema Version Check Tests
+ensure_schema on fresh, current and outdated databases
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, inspect
+
+from config.schema import (
+    SCHEMA_VERSION, SchemaVersionError, ensure_schema, get_schema_version, stamp_schema_version
+)
+from config.settings import settings
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+def record_statements(engine) -> list:
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def test_unversioned_sqlite_is_created_and_stamped(engine):
+    assert get_schema_version(engine) is None
+
+    assert ensure_schema(engine) == SCHEMA_VERSION
+    assert get_schema_version(engine) == SCHEMA_VERSION
+    assert {"users", "measurements", "profile_body_models"} <= set(inspect(engine).get_table_names())
+
+
+def test_current_schema_takes_one_query(engine):
+    ensure_schema(engine)
+    statements = record_statements(engine)
+
+    assert ensure_schema(engine) == SCHEMA_VERSION
+    assert len(statements) == 1
+
+
+def test_outdated_schema_is_refused(engine):
+    with engine.begin() as conn:
+        stamp_schema_version(conn, "0001")
+
+    with pytest.raises(SchemaVersionError, match="alembic upgrade head"):
+        ensure_schema(engine)
+    assert not inspect(engine).has_table("users")  # Nothing created over an old schema
+
+
+def test_unversioned_server_database_is_not_created(engine, monkeypatch):
+    monkeypatch.setattr(engine.dialect, "name", "postgresql")
+    monkeypatch.setattr(settings, "AUTO_CREATE_SCHEMA", False)
+
+    with pytest.raises(SchemaVersionError, match="no version"):
+        ensure_schema(engine)
+    assert not inspect(engine).has_table("users")
@@ -0,0 +1,67 @@
+"""
+Request Tracing Tests
+Request ids, stage timings and the sampled trace log
+"""
+
+import logging
+
+import pytest
+
+from config.settings import settings
+from middleware.tracing import MAX_SPANS, Trace, logger
+from conftest import capture, register
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def trace_log(monkeypatch):
+    """Records of the tracing logger, with every request sampled"""
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+    handler = RecordingHandler()
+    logger.addHandler(handler)
+    yield handler.records
+    logger.removeHandler(handler)
+
+
+def test_capture_trace_has_stage_timings(client, fake_ai, trace_log):
+    login = register(client)
+    trace_log.clear()
+
+    response = capture(client, login, headers={"X-Request-ID": "capture-123"})
+    assert response.status_code == 201
+    assert response.headers["X-Request-ID"] == "capture-123"
+    assert fake_ai.headers["X-Request-ID"] == "capture-123"
+
+    [record] = trace_log
+    assert record.request_id == "capture-123"
+    assert record.path == "/api/measurements/capture"
+    assert record.status == 201
+    assert {"db", "ai_call", "ai.decode", "ai.detect"} <= set(record.stages)
+    assert record.stages["ai.detect"] == 20.0
+    assert record.stages["db"] > 0
+    assert any(span["name"] == "db" and span["statement"] for span in record.spans)
+    assert record.duration_ms >= record.stages["ai_call"]
+
+
+def test_invalid_request_id_is_replaced(client, trace_log):
+    response = client.get("/health", headers={"X-Request-ID": "not valid!"})
+    request_id = response.headers["X-Request-ID"]
+    assert request_id != "not valid!"
+    assert trace_log[-1].request_id == request_id
+
+
+def test_stage_totals_count_past_span_limit():
+    trace = Trace("request")
+    for _ in range(MAX_SPANS + 50):
+        trace.add("db", 1.0)
+
+    assert len(trace.spans) == MAX_SPANS
+    assert trace.stages["db"] == MAX_SPANS + 50
@@ -0,0 +1,76 @@
+"""
+User Route Tests
+Registration, login and token refresh
+"""
+
+import threading
+
+import services.password_service as password_service
+from conftest import PASSWORD, auth_headers, register
+
+
+def test_register_login_and_me(client):
+    login = register(client, "ada@example.com")
+    assert login["token_type"] == "bearer"
+    assert login["user"]["email"] == "ada@example.com"
+
+    response = client.get("/api/users/me", headers=auth_headers(login))
+    assert response.status_code == 200
+    assert response.json()["id"] == login["user"]["id"]
+
+
+def test_register_duplicate_email(client):
+    register(client, "ada@example.com")
+    response = client.post("/api/users/register", json={
+        "email": "ada@example.com", "password": PASSWORD,
+        "first_name": "Ada", "last_name": "L", "gender": "female"
+    })
+    assert response.status_code == 400
+
+
+def test_login_rejects_bad_credentials(client):
+    register(client, "ada@example.com")
+    for email, password in (("ada@example.com", "wrong"), ("nobody@example.com", PASSWORD)):
+        response = client.post("/api/users/login", json={"email": email, "password": password})
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Invalid credentials"
+
+
+def test_unknown_email_still_verifies_a_hash(client, monkeypatch):
+    threads = []
+    real_verify = password_service._verify_dummy
+
+    def recording_verify(password):
+        threads.append(threading.current_thread().name)
+        real_verify(password)
+
+    password_service._dummy_hash.cache_clear()
+    monkeypatch.setattr(password_service, "_verify_dummy", recording_verify)
+    for _ in range(2):
+        response = client.post("/api/users/login",
+                               json={"email": "nobody@example.com", "password": PASSWORD})
+        assert response.status_code == 401
+
+    # Verified on the hashing pool against a dummy hash made once, on first use
+    assert len(threads) == 2 and all(name.startswith("password-hash") for name in threads)
+    assert password_service._dummy_hash.cache_info().misses == 1
+
+
+def test_refresh_issues_new_tokens(client):
+    login = register(client)
+
+    response = client.post("/api/users/refresh", json={"refresh_token": login["refresh_token"]})
+    assert response.status_code == 200
+    tokens = response.json()
+    assert client.get("/api/users/me", headers=auth_headers(tokens)).status_code == 200
+
+    # An access token is not accepted as a refresh token, nor the reverse
+    response = client.post("/api/users/refresh", json={"refresh_token": login["access_token"]})
+    assert response.status_code == 401
+    response = client.get("/api/users/me",
+                          headers={"Authorization": f"Bearer {login['refresh_token']}"})
+    assert response.status_code == 401
+
+
+def test_me_requires_token(client):
+    assert client.get("/api/users/me").status_code == 401
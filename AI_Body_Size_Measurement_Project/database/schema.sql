@@ -86,6 +86,7 @@ CREATE TABLE measurements (
     processing_time_ms INTEGER,
     ai_model_version VARCHAR(50),
     reference_object VARCHAR(50), -- 'credit_card', 'a4_sheet', etc.
+    landmarks BYTEA, -- Packed float32[33][4] pose landmarks (x, y, z, visibility)
     
     -- Status
     status VARCHAR(20) DEFAULT 'completed' CHECK (status IN ('processing', 'completed', 'flagged', 'rejected')),
@@ -101,6 +102,32 @@ CREATE INDEX idx_measurements_user_id ON measurements(user_id);
 CREATE INDEX idx_measurements_profile_id ON measurements(profile_id);
 CREATE INDEX idx_measurements_date ON measurements(measurement_date);
 CREATE INDEX idx_measurements_status ON measurements(status);
+CREATE INDEX idx_measurements_user_date ON measurements(user_id, measurement_date DESC);
+
+-- ============================================
+-- SIZE CHARTS TABLE (Brand-Specific)
+-- ============================================
+CREATE TABLE size_charts (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    brand_name VARCHAR(100) NOT NULL,
+    gender VARCHAR(10) NOT NULL CHECK (gender IN ('male', 'female', 'unisex')),
+    category VARCHAR(50), -- 'shirts', 'pants', 'dresses', etc.
+    
+    -- Size mappings (JSON format for flexibility)
+    size_data JSONB NOT NULL,
+    -- Example: {"S": {"chest": [86, 91], "waist": [71, 76]}, "M": {...}}
+    
+    region VARCHAR(10) DEFAULT 'US', -- 'US', 'UK', 'EU', 'Asia'
+    is_active BOOLEAN DEFAULT TRUE,
+    version INTEGER DEFAULT 1,
+    
+    created_by UUID REFERENCES users(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_size_charts_brand ON size_charts(brand_name);
+CREATE INDEX idx_size_charts_gender ON size_charts(gender);
 
 -- ============================================
 -- SIZE RECOMMENDATIONS TABLE
@@ -132,30 +159,19 @@ CREATE TABLE size_recommendations (
 CREATE INDEX idx_size_rec_measurement_id ON size_recommendations(measurement_id);
 
 -- ============================================
--- SIZE CHARTS TABLE (Brand-Specific)
+-- PROFILE BODY MODELS TABLE
 -- ============================================
-CREATE TABLE size_charts (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    brand_name VARCHAR(100) NOT NULL,
-    gender VARCHAR(10) NOT NULL CHECK (gender IN ('male', 'female', 'unisex')),
-    category VARCHAR(50), -- 'shirts', 'pants', 'dresses', etc.
-    
-    -- Size mappings (JSON format for flexibility)
-    size_data JSONB NOT NULL,
-    -- Example: {"S": {"chest": [86, 91], "waist": [71, 76]}, "M": {...}}
-    
-    region VARCHAR(10) DEFAULT 'US', -- 'US', 'UK', 'EU', 'Asia'
-    is_active BOOLEAN DEFAULT TRUE,
-    version INTEGER DEFAULT 1,
-    
-    created_by UUID REFERENCES users(id),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+-- Current body estimate per profile, maintained incrementally by the backend
+CREATE TABLE profile_body_models (
+    profile_id UUID PRIMARY KEY REFERENCES measurement_profiles(id) ON DELETE CASCADE,
+    latest_measurement_id UUID REFERENCES measurements(id) ON DELETE SET NULL,
+    general_size VARCHAR(10),
+    measurement_count INTEGER DEFAULT 0,
+    estimates JSONB DEFAULT '{}'::jsonb, -- {"chest": 98.4, ...}
+    weighted_sums JSONB DEFAULT '{}'::jsonb, -- {"chest": [sum(w*x), sum(w)], ...}
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_size_charts_brand ON size_charts(brand_name);
-CREATE INDEX idx_size_charts_gender ON size_charts(gender);
-
 -- ============================================
 -- USER FEEDBACK TABLE
 -- ============================================
@@ -322,6 +338,17 @@ SELECT
 FROM users u
 LEFT JOIN measurements m ON u.id = m.user_id;
 
+-- ============================================
+-- SCHEMA VERSION
+-- ============================================
+
+-- Alembic revision this schema corresponds to (checked by the backend at startup)
+CREATE TABLE alembic_version (
+    version_num VARCHAR(32) NOT NULL PRIMARY KEY
+);
+
+INSERT INTO alembic_version (version_num) VALUES ('0003');
+
 -- ============================================
 -- COMMENTS
 -- ============================================
@@ -0,0 +1,211 @@
+"""
+Sampling Profiler
+On-demand statistical profiler for production latency investigations,
+shared by the backend (middleware/profiler.py) and the AI server
+
+A background thread snapshots Python stacks at a fixed interval, either
+for N seconds or while the next K requests run. Results are served as
+collapsed stacks (flamegraph.pl / speedscope input) and as a
+top-functions table. Nothing samples until a session is started; while
+idle the only cost is one attribute check per request.
+
+Standard library only, so both services can load it from shared/.
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import os
+import sys
+import threading
+import time
+
+
+Frame = Tuple[str, str, int]
+
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, lineno = frame
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+class SamplingProfiler:
+    """Samples Python stacks of all threads for one session at a time"""
+
+    def __init__(self, interval: float, max_seconds: float, track_threads: bool = False):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        # When set, only threads inside a profiled request are sampled
+        # (thread-per-request servers); otherwise every thread is
+        self.track_threads = track_threads
+        self.active = False
+        self._lock = threading.Lock()
+        self._mode: Optional[str] = None
+        self._remaining = 0
+        self._in_flight = 0
+        self._threads: set = set()
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        # Every session ends by this monotonic time, whatever its mode
+        self._deadline = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start_timed(self, seconds: float):
+        """Sample for the given number of seconds"""
+        with self._lock:
+            self._reset("seconds")
+            self._deadline = time.monotonic() + min(seconds, self.max_seconds)
+            self.active = True
+            self._start_sampling()
+
+    def start_requests(self, count: int):
+        """Sample from the next request's start until `count` requests have finished.
+
+        The session still ends after max_seconds, even if fewer requests
+        (or none) arrive.
+        """
+        with self._lock:
+            self._reset("requests")
+            self._remaining = count
+            self._deadline = time.monotonic() + self.max_seconds
+            self.active = True
+
+    def cancel(self) -> bool:
+        """End the running session early, keeping what was sampled; False if none"""
+        with self._lock:
+            if not self.active:
+                return False
+            self._stop.set()
+            thread = self._thread
+            if thread is None:
+                self._finish()
+        if thread is not None:
+            thread.join()
+        return True
+
+    def request_started(self) -> bool:
+        """Call at the start of each request; True if this request is profiled"""
+        if not self.active:
+            return False
+        with self._lock:
+            self._expire_if_due()
+            if not self.active:
+                return False
+            if self._mode == "requests":
+                if self._remaining <= self._in_flight:
+                    return False
+                self._in_flight += 1
+                if self._thread is None:
+                    self._start_sampling()
+            if self.track_threads:
+                self._threads.add(threading.get_ident())
+            return True
+
+    def request_finished(self, profiled: bool):
+        """Call at the end of each request with request_started()'s result"""
+        if not profiled:
+            return
+        with self._lock:
+            self._threads.discard(threading.get_ident())
+            if self._mode == "requests" and self._remaining:
+                self._in_flight -= 1
+                self._remaining -= 1
+                if self._remaining == 0:
+                    self._stop.set()
+
+    def _expire_if_due(self):
+        """End a request-count session that never saw a request (holding _lock)"""
+        if self.active and self._thread is None and time.monotonic() >= self._deadline:
+            self._finish()
+
+    def _finish(self):
+        self.active = False
+        self._finished_at = time.time()
+
+    def _reset(self, mode: str):
+        self._expire_if_due()
+        if self.active:
+            raise RuntimeError("A profiling session is already running")
+        self._mode = mode
+        self._remaining = 0
+        self._in_flight = 0
+        self._threads = set()
+        self._stacks = Counter()
+        self._samples = 0
+        self._started_at = None
+        self._finished_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _start_sampling(self):
+        self._started_at = time.time()
+        self._thread = threading.Thread(
+            target=self._sample_loop, args=(self._deadline,), name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def _sample_loop(self, deadline: float):
+        own_ident = threading.get_ident()
+        try:
+            while time.monotonic() < deadline:
+                threads = self._threads if self.track_threads else None
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_ident or (threads is not None and ident not in threads):
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                        frame = frame.f_back
+                    self._stacks[tuple(reversed(stack))] += 1
+                    self._samples += 1
+                if self._stop.wait(self.interval):
+                    break
+        finally:
+            # A failed session must not leave the profiler stuck as running
+            with self._lock:
+                self._finish()
+
+    def status(self) -> Dict:
+        with self._lock:
+            self._expire_if_due()
+        return {
+            "state": "running" if self.active else ("finished" if self._finished_at else "idle"),
+            "mode": self._mode,
+            "remaining_requests": self._remaining if self._mode == "requests" else None,
+            "samples": self._samples,
+            "interval_ms": self.interval * 1000,
+            "started_at": self._started_at,
+            "finished_at": self._finished_at,
+        }
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format: 'root;child;leaf count' per line"""
+        return "\n".join(
+            f"{';'.join(_frame_label(frame) for frame in stack)} {count}"
+            for stack, count in sorted(self._stacks.items(), key=lambda item: -item[1])
+        ) + "\n"
+
+    def top(self, limit: int = 50) -> List[Dict]:
+        """Functions by self samples, with inclusive (total) samples"""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self._stacks.items():
+            self_counts[stack[-1]] += count
+            for frame in set(stack):
+                total_counts[frame] += count
+
+        samples = self._samples or 1
+        ranked = sorted(total_counts, key=lambda frame: (-self_counts[frame], -total_counts[frame]))
+        return [
+            {
+                "function": _frame_label(frame),
+                "self": self_counts[frame],
+                "total": total_counts[frame],
+                "self_pct": round(100 * self_counts[frame] / samples, 1),
+                "total_pct": round(100 * total_counts[frame] / samples, 1),
+            }
+            for frame in ranked[:limit]
+        ]